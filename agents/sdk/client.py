@@ -7,6 +7,7 @@ from typing import Dict, Any, Optional
 
 from solders.keypair import Keypair
 from solders.pubkey import Pubkey
+from solders.hash import Hash
 from solders.system_program import TransferParams, transfer
 from solders.transaction import Transaction
 from solders.message import Message
@@ -72,12 +73,14 @@ class PortSolClient:
         except Exception:
             return 0
 
-    def enter_world(self, max_retries: int = 3) -> tuple:
+    def enter_world(self, max_retries: int = 3, recent_blockhash: str = None) -> tuple:
         """
         Send SOL entry fee to treasury wallet.
         Returns: (success, tx_signature_or_error)
 
         Retries on transient errors (e.g. Blockhash not found on devnet).
+        If recent_blockhash is given it is used for the first attempt instead
+        of fetching one; retries always fetch a fresh blockhash.
         """
         if not self._keypair:
             return False, "Keypair not set"
@@ -107,15 +110,18 @@ class PortSolClient:
                 ))
 
                 # Get recent blockhash with Finalized commitment for reliability
-                blockhash_resp = self.client.get_latest_blockhash(commitment=Finalized)
-                recent_blockhash = blockhash_resp.value.blockhash
+                if recent_blockhash and attempt == 0:
+                    blockhash = Hash.from_string(recent_blockhash)
+                else:
+                    blockhash_resp = self.client.get_latest_blockhash(commitment=Finalized)
+                    blockhash = blockhash_resp.value.blockhash
 
                 # Build, sign, send
                 msg = Message.new_with_blockhash(
-                    [ix], sender.pubkey(), recent_blockhash
+                    [ix], sender.pubkey(), blockhash
                 )
                 tx = Transaction.new_unsigned(msg)
-                tx.sign([sender], recent_blockhash)
+                tx.sign([sender], blockhash)
 
                 # Send with matching preflight commitment
                 resp = self.client.send_transaction(
@@ -17,10 +17,17 @@ import sys
 import json
 import time
 import asyncio
-import requests
+import httpx
 from pathlib import Path
 from dotenv import load_dotenv
 
+# HTTP/2 lets concurrent RPC / API calls share one connection (needs the h2 package)
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
 load_dotenv(Path(__file__).parent.parent / '.env')
 
 if sys.platform == 'win32':
@@ -37,6 +44,14 @@ API_URL = os.getenv("API_URL", "http://localhost:8000")
 ENTRY_FEE_LAMPORTS = int(os.getenv("ENTRY_FEE_LAMPORTS", "10000000"))
 TREASURY_PUBKEY = os.getenv("TREASURY_PUBKEY")
 TREASURY_KEYPAIR = os.getenv("TREASURY_KEYPAIR")
+RPC_URL = os.getenv("SOLANA_RPC_URL", "https://api.devnet.solana.com")
+
+# Shared connection pools so RPC / API calls (and retries) reuse keep-alive connections
+RPC = httpx.AsyncClient(
+    base_url=RPC_URL, http2=HTTP2_AVAILABLE, timeout=15,
+    limits=httpx.Limits(max_keepalive_connections=8),
+)
+API = httpx.AsyncClient(base_url=API_URL, http2=HTTP2_AVAILABLE, timeout=10)
 
 BOTS = [
     {"name": "MinerBot",    "wallet": os.getenv("MINER_WALLET"),    "keypair": os.getenv("MINER_KEYPAIR")},
@@ -45,82 +60,127 @@ BOTS = [
 ]
 
 
-def get_balance_sol(address: str) -> float:
+# Output is queued per phase and written in one call by flush_out()
+_out_lines: list = []
+
+
+def out(line: str = ""):
+    """Queue a line of output."""
+    _out_lines.append(line)
+
+
+def flush_out():
+    """Write all queued output in a single stdout write."""
+    if _out_lines:
+        sys.stdout.write("\n".join(_out_lines) + "\n")
+        sys.stdout.flush()
+        _out_lines.clear()
+
+
+async def rpc_post(payload, *, max_retries: int = 4):
+    """POST a JSON-RPC payload, backing off on 429 / 5xx (honours Retry-After)."""
+    for attempt in range(max_retries + 1):
+        resp = await RPC.post("", json=payload)
+        if resp.status_code != 429 and resp.status_code < 500:
+            break
+        if attempt == max_retries:
+            resp.raise_for_status()
+        wait = float(resp.headers.get("Retry-After", 2 ** attempt))
+        flush_out()
+        print(f"  RPC returned {resp.status_code}, retrying in {wait}s...")
+        await asyncio.sleep(wait)
+    return resp.json()
+
+
+async def get_balance_sol(address: str) -> float:
     """Get SOL balance from Solana devnet RPC."""
-    rpc = os.getenv("SOLANA_RPC_URL", "https://api.devnet.solana.com")
-    resp = requests.post(rpc, json={
+    data = await rpc_post({
         "jsonrpc": "2.0", "id": 1,
         "method": "getBalance",
         "params": [address]
-    }, timeout=15)
-    lamports = resp.json().get("result", {}).get("value", 0)
+    })
+    lamports = data.get("result", {}).get("value", 0)
     return lamports / LAMPORTS_PER_SOL
 
 
+async def get_fresh_blockhash() -> str:
+    """Fetch one recent blockhash to sign every transaction in a phase."""
+    data = await rpc_post({
+        "jsonrpc": "2.0", "id": 1,
+        "method": "getLatestBlockhash",
+        "params": [{"commitment": "finalized"}]
+    })
+    return data["result"]["value"]["blockhash"]
+
+
 def print_balances(label: str, balances: dict):
     """Pretty print balance table."""
-    print(f"\n{'='*60}")
-    print(f"  {label}")
-    print(f"{'='*60}")
+    out(f"\n{'='*60}")
+    out(f"  {label}")
+    out(f"{'='*60}")
     for name, sol in balances.items():
-        print(f"  {name:<15} {sol:.9f} SOL")
-    print(f"{'='*60}")
+        out(f"  {name:<15} {sol:.9f} SOL")
+    out(f"{'='*60}")
 
 
-def fetch_all_balances() -> dict:
-    """Fetch all wallet balances."""
-    balances = {"Treasury": get_balance_sol(TREASURY_PUBKEY)}
-    for bot in BOTS:
-        balances[bot["name"]] = get_balance_sol(bot["wallet"])
-    return balances
+async def fetch_all_balances() -> dict:
+    """Fetch all wallet balances concurrently."""
+    wallets = [("Treasury", TREASURY_PUBKEY)] + [(bot["name"], bot["wallet"]) for bot in BOTS]
+    sols = await asyncio.gather(*[get_balance_sol(addr) for _, addr in wallets])
+    return {name: sol for (name, _), sol in zip(wallets, sols)}
 
 
-async def phase2_entry():
+async def phase2_entry(clients: dict):
     """Phase 2: Each agent enters the world (pays entry fee)."""
-    print("\n" + "="*60)
-    print("  PHASE 2: ENTRY (Deposit 0.01 SOL each)")
-    print("="*60)
+    out("\n" + "="*60)
+    out("  PHASE 2: ENTRY (Deposit 0.01 SOL each)")
+    out("="*60)
+
+    # One blockhash is valid for ~60s, enough for every entry in this phase
+    blockhash = await get_fresh_blockhash()
 
     results = []
     for bot in BOTS:
-        print(f"\n  {bot['name']}: Entering world (0.01 SOL -> Treasury)...")
-        client = PortSolClient(API_URL, bot["wallet"], bot["keypair"])
-        success, result = client.enter_world()
+        out(f"\n  {bot['name']}: Entering world (0.01 SOL -> Treasury)...")
+        client = clients[bot["name"]]
+        flush_out()
+        success, result = client.enter_world(recent_blockhash=blockhash)
         if success:
-            print(f"    SUCCESS: TX {result[:20]}...")
+            out(f"    SUCCESS: TX {result[:20]}...")
             results.append(True)
         else:
             if "already" in str(result).lower() or "entry" in str(result).lower():
-                print(f"    ALREADY ENTERED (OK): {result}")
+                out(f"    ALREADY ENTERED (OK): {result}")
                 results.append(True)
             else:
-                print(f"    FAILED: {result}")
+                out(f"    FAILED: {result}")
                 results.append(False)
         time.sleep(2)  # Wait between transactions
-    
+
+    flush_out()
     return all(results)
 
 
-async def phase3_game():
+async def phase3_game(clients: dict):
     """Phase 3: Register agents, play actions, advance ticks."""
-    print("\n" + "="*60)
-    print("  PHASE 3: GAME (Register, play, advance ticks)")
-    print("="*60)
+    out("\n" + "="*60)
+    out("  PHASE 3: GAME (Register, play, advance ticks)")
+    out("="*60)
 
     # First reset the world for a clean test
-    print("\n  Resetting world state...")
+    out("\n  Resetting world state...")
     try:
-        r = requests.post(f"{API_URL}/debug/reset_world", timeout=10)
-        print(f"    Reset: {r.json()}")
+        r = await API.post("/debug/reset_world")
+        out(f"    Reset: {r.json()}")
     except Exception as e:
-        print(f"    Reset failed (may not be in debug mode): {e}")
+        out(f"    Reset failed (may not be in debug mode): {e}")
 
     # Register each agent
     for bot in BOTS:
-        print(f"\n  Registering {bot['name']}...")
-        client = PortSolClient(API_URL, bot["wallet"], bot["keypair"])
+        out(f"\n  Registering {bot['name']}...")
+        client = clients[bot["name"]]
         result = await client.register(bot["name"])
-        print(f"    Result: {result.get('message', result)}")
+        out(f"    Result: {result.get('message', result)}")
 
         # Do some actions based on bot type
         if bot["name"] == "MinerBot":
@@ -155,55 +215,59 @@ async def phase3_game():
             msg = result.get("message", str(result))
             success = result.get("success", False)
             symbol = "OK" if success else "FAIL"
-            print(f"    [{symbol}] {action}({params}) -> {msg[:60]}")
-
-        await client.close()
+            out(f"    [{symbol}] {action}({params}) -> {msg[:60]}")
 
     # Advance a few ticks
-    print("\n  Advancing ticks...")
-    for i in range(3):
-        try:
-            r = requests.post(f"{API_URL}/debug/advance_tick", timeout=10)
-            tick_data = r.json()
-            print(f"    Tick {tick_data.get('tick', '?')}: prices={tick_data.get('market_prices', {})}")
-        except Exception as e:
-            print(f"    Tick advance failed: {e}")
-        time.sleep(0.5)
+    out("\n  Advancing ticks...")
+    ticks = []
+    try:
+        r = await API.post("/debug/advance_ticks", params={"n": 3})
+        if r.status_code == 404:
+            # Older server without the batch endpoint: advance one tick at a time
+            for i in range(3):
+                ticks.append((await API.post("/debug/advance_tick")).json())
+        else:
+            ticks = r.json().get("ticks", [])
+    except Exception as e:
+        out(f"    Tick advance failed: {e}")
+    for tick_data in ticks:
+        out(f"    Tick {tick_data.get('tick', '?')}: prices={tick_data.get('market_prices', {})}")
 
     # Get final agent states
-    print("\n  Final agent states:")
+    out("\n  Final agent states:")
     credits_map = {}
     for bot in BOTS:
         try:
-            r = requests.get(f"{API_URL}/agent/{bot['wallet']}/state", timeout=10)
+            r = await API.get(f"/agent/{bot['wallet']}/state")
             state = r.json()
             credits = state.get("credits", 0)
             inv = state.get("inventory", {})
             inv_count = sum(inv.values()) if isinstance(inv, dict) else 0
             credits_map[bot["name"]] = credits
-            print(f"    {bot['name']:<15} credits={credits:<6} inventory_items={inv_count} energy={state.get('energy', '?')}")
+            out(f"    {bot['name']:<15} credits={credits:<6} inventory_items={inv_count} energy={state.get('energy', '?')}")
         except Exception as e:
-            print(f"    {bot['name']}: ERROR - {e}")
+            out(f"    {bot['name']}: ERROR - {e}")
             credits_map[bot["name"]] = 1000  # default
 
+    flush_out()
     return credits_map
 
 
 async def phase4_settlement():
     """Phase 4: Treasury distributes SOL back to agents based on credits."""
-    print("\n" + "="*60)
-    print("  PHASE 4: SETTLEMENT (Withdraw SOL from treasury)")
-    print("="*60)
+    out("\n" + "="*60)
+    out("  PHASE 4: SETTLEMENT (Withdraw SOL from treasury)")
+    out("="*60)
 
     gate = get_gate_client()
     treasury_keypair_bytes = bytes(json.loads(TREASURY_KEYPAIR))
 
     # Fetch agent credits from API
-    print("\n  Fetching final credits from API...")
+    out("\n  Fetching final credits from API...")
     credits_map = {}
     for bot in BOTS:
         try:
-            r = requests.get(f"{API_URL}/agent/{bot['wallet']}/state", timeout=10)
+            r = await API.get(f"/agent/{bot['wallet']}/state")
             state = r.json()
             credits_map[bot["name"]] = {
                 "wallet": bot["wallet"],
@@ -219,98 +283,131 @@ async def phase4_settlement():
     num_agents = len(BOTS)
     pool_lamports = ENTRY_FEE_LAMPORTS * num_agents  # 0.03 SOL
 
-    print(f"\n  Prize Pool: {pool_lamports / LAMPORTS_PER_SOL} SOL")
-    print(f"  Total Credits: {total_credits}")
-
-    # Calculate and send distributions
-    print(f"\n  {'Agent':<15} {'Credits':>8} {'Share':>8} {'Payout':>14}")
-    print(f"  {'-'*48}")
-
-    for name, info in credits_map.items():
-        share = info["credits"] / total_credits if total_credits > 0 else 0
-        payout_lamports = int(pool_lamports * share)
-        payout_sol = payout_lamports / LAMPORTS_PER_SOL
-
-        print(f"  {name:<15} {info['credits']:>8} {share:>7.1%} {payout_sol:>12.6f} SOL")
+    out(f"\n  Prize Pool: {pool_lamports / LAMPORTS_PER_SOL} SOL")
+    out(f"  Total Credits: {total_credits}")
+
+    # Calculate all payouts first (integer lamports, so the pool drains exactly)
+    payouts = [
+        (name, info["wallet"], info["credits"],
+         pool_lamports * info["credits"] // total_credits if total_credits > 0 else 0)
+        for name, info in credits_map.items()
+    ]
+    remainder = pool_lamports - sum(p[3] for p in payouts)
+    if total_credits > 0 and remainder:
+        i = max(range(len(payouts)), key=lambda j: payouts[j][3])
+        name, wallet, credits, lamports = payouts[i]
+        payouts[i] = (name, wallet, credits, lamports + remainder)
+
+    out(f"\n  {'Agent':<15} {'Credits':>8} {'Share':>8} {'Payout':>14}")
+    out(f"  {'-'*48}")
+    for name, wallet, credits, lamports in payouts:
+        share = credits / total_credits if total_credits > 0 else 0
+        out(f"  {name:<15} {credits:>8} {share:>7.1%} {lamports / LAMPORTS_PER_SOL:>12.6f} SOL")
+
+    # One blockhash is valid for ~60s, enough for every payout in this phase
+    blockhash = await get_fresh_blockhash()
+
+    # Send distributions
+    for name, wallet, credits, lamports in payouts:
+        if lamports <= 0:
+            continue
+        out(f"\n  Sending {lamports / LAMPORTS_PER_SOL:.6f} SOL to {name} ({wallet[:16]}...)")
+        flush_out()
+        ok, result = gate.send_sol(
+            treasury_keypair_bytes, wallet, lamports,
+            recent_blockhash=blockhash,
+        )
+        if ok:
+            out(f"    TX: {result}")
+        else:
+            out(f"    FAILED: {result}")
+        time.sleep(3)  # Wait between transactions
 
-        if payout_lamports > 0:
-            print(f"    Sending {payout_sol:.6f} SOL to {info['wallet'][:16]}...")
-            ok, result = gate.send_sol(treasury_keypair_bytes, info["wallet"], payout_lamports)
-            if ok:
-                print(f"    TX: {result}")
-            else:
-                print(f"    FAILED: {result}")
-            time.sleep(3)  # Wait between transactions
+    flush_out()
 
 
-async def main():
-    print("="*60)
-    print("  PORT SOL - COMPLETE DEPOSIT/WITHDRAWAL TEST")
-    print("="*60)
-    print(f"  API: {API_URL}")
-    print(f"  Entry Fee: {ENTRY_FEE_LAMPORTS / LAMPORTS_PER_SOL} SOL per agent")
-    print(f"  Treasury: {TREASURY_PUBKEY}")
-    print(f"  Network: Solana Devnet")
+async def run_test():
+    out("="*60)
+    out("  PORT SOL - COMPLETE DEPOSIT/WITHDRAWAL TEST")
+    out("="*60)
+    out(f"  API: {API_URL}")
+    out(f"  Entry Fee: {ENTRY_FEE_LAMPORTS / LAMPORTS_PER_SOL} SOL per agent")
+    out(f"  Treasury: {TREASURY_PUBKEY}")
+    out(f"  Network: Solana Devnet")
 
     # --- Phase 1: Pre-test balances ---
-    print("\n" + "="*60)
-    print("  PHASE 1: PRE-TEST BALANCES")
-    print("="*60)
-    pre_balances = fetch_all_balances()
+    out("\n" + "="*60)
+    out("  PHASE 1: PRE-TEST BALANCES")
+    out("="*60)
+    flush_out()
+    pre_balances = await fetch_all_balances()
     print_balances("BEFORE TEST", pre_balances)
+    flush_out()
 
-    # --- Phase 2: Entry ---
-    entry_ok = await phase2_entry()
-    if not entry_ok:
-        print("\nEntry phase had failures, continuing anyway...")
+    # One client (and HTTP session) per bot for the whole run
+    clients = {bot["name"]: PortSolClient(API_URL, bot["wallet"], bot["keypair"]) for bot in BOTS}
+    try:
+        # --- Phase 2: Entry ---
+        entry_ok = await phase2_entry(clients)
+        if not entry_ok:
+            out("\nEntry phase had failures, continuing anyway...")
+            flush_out()
 
-    time.sleep(3)
+        time.sleep(3)
 
-    # --- Phase 3: Game ---
-    credits_map = await phase3_game()
+        # --- Phase 3: Game ---
+        credits_map = await phase3_game(clients)
 
-    time.sleep(2)
+        time.sleep(2)
 
-    # --- Phase 4: Settlement ---
-    await phase4_settlement()
+        # --- Phase 4: Settlement ---
+        await phase4_settlement()
+    finally:
+        await asyncio.gather(*[c.close() for c in clients.values()])
 
     time.sleep(5)  # Wait for transactions to confirm
 
     # --- Phase 5: Post-test balances ---
-    print("\n" + "="*60)
-    print("  PHASE 5: POST-TEST BALANCES")
-    print("="*60)
-    post_balances = fetch_all_balances()
+    out("\n" + "="*60)
+    out("  PHASE 5: POST-TEST BALANCES")
+    out("="*60)
+    flush_out()
+    post_balances = await fetch_all_balances()
     print_balances("AFTER TEST", post_balances)
 
     # --- Summary ---
-    print("\n" + "="*60)
-    print("  BALANCE CHANGES SUMMARY")
-    print("="*60)
-    print(f"  {'Wallet':<15} {'Before':>12} {'After':>12} {'Change':>12}")
-    print(f"  {'-'*54}")
-    for name in pre_balances:
-        before = pre_balances[name]
-        after = post_balances.get(name, 0)
+    out("\n" + "="*60)
+    out("  BALANCE CHANGES SUMMARY")
+    out("="*60)
+    out(f"  {'Wallet':<15} {'Before':>12} {'After':>12} {'Change':>12}")
+    out(f"  {'-'*54}")
+    diffs = [(name, before, post_balances.get(name, 0.0)) for name, before in pre_balances.items()]
+    for name, before, after in diffs:
         change = after - before
         sign = "+" if change >= 0 else ""
-        print(f"  {name:<15} {before:>11.6f} {after:>11.6f} {sign}{change:>10.6f}")
+        out(f"  {name:<15} {before:>11.6f} {after:>11.6f} {sign}{change:>10.6f}")
 
     # Verify: agents should have roughly gotten back their entry fees
-    total_agent_change = sum(
-        post_balances.get(bot["name"], 0) - pre_balances.get(bot["name"], 0)
-        for bot in BOTS
-    )
+    total_agent_change = sum(after - before for name, before, after in diffs if name != "Treasury")
     treasury_change = post_balances["Treasury"] - pre_balances["Treasury"]
 
-    print(f"\n  Total agent balance change: {total_agent_change:+.6f} SOL")
-    print(f"  Treasury balance change:    {treasury_change:+.6f} SOL")
-    print(f"  Net flow (should be ~0):    {total_agent_change + treasury_change:+.6f} SOL")
-    print(f"  (Difference is transaction fees on Solana)")
+    out(f"\n  Total agent balance change: {total_agent_change:+.6f} SOL")
+    out(f"  Treasury balance change:    {treasury_change:+.6f} SOL")
+    out(f"  Net flow (should be ~0):    {total_agent_change + treasury_change:+.6f} SOL")
+    out(f"  (Difference is transaction fees on Solana)")
 
-    print("\n" + "="*60)
-    print("  TEST COMPLETE")
-    print("="*60)
+    out("\n" + "="*60)
+    out("  TEST COMPLETE")
+    out("="*60)
+    flush_out()
+
+
+async def main():
+    try:
+        await run_test()
+    finally:
+        # Shared RPC/API clients stay open through Phase 5 and the summary
+        await asyncio.gather(RPC.aclose(), API.aclose())
 
 
 if __name__ == "__main__":
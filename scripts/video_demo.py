@@ -19,6 +19,8 @@ import sys
 import json
 import time
 import asyncio
+import hashlib
+import logging
 import random
 from pathlib import Path
 from datetime import datetime
@@ -32,11 +34,16 @@ from dotenv import load_dotenv
 load_dotenv(Path(__file__).parent.parent / '.env')
 
 import aiohttp
-import requests
+import orjson
 
 from engine.blockchain import get_gate_client
 from sdk.client import PortSolClient
 
+log = logging.getLogger(__name__)
+
+# Errors a world-API / RPC call can raise (network, timeout, bad JSON body)
+HTTP_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError, json.JSONDecodeError)
+
 # ─── Constants ───────────────────────────────────────────────────────
 LAMPORTS_PER_SOL = 1_000_000_000
 API_URL = os.getenv("API_URL", "http://localhost:8000")
@@ -55,6 +62,10 @@ MOLTBOOK_HOST_KEY = os.getenv("MOLTBOOK_HOST_KEY", "")
 
 NUM_TICKS = 8  # Good length for a 2-3 min video
 
+# Skip the LLM when the heuristic answer is obvious (must rest / can sell now).
+# Set to false to have every decision come from the LLM for demo flair.
+SKIP_LLM_ON_OBVIOUS = os.getenv("SKIP_LLM_ON_OBVIOUS", "true").lower() in ("true", "1", "yes")
+
 BOTS = [
     {
         "name": "MinerBot",    "role": "Resource Gatherer",  "emoji": "⛏️",
@@ -85,6 +96,10 @@ Style: Formal, says "for the good of all agents", uses governance terms."""
     }
 ]
 
+# Name lookups used by the table renderers
+EMOJI_BY_NAME = {b["name"]: b["emoji"] for b in BOTS}
+WALLET_BY_NAME = {b["name"]: b["wallet"] for b in BOTS}
+
 
 # ─── ANSI Colors ─────────────────────────────────────────────────────
 class C:
@@ -99,6 +114,10 @@ class C:
     WHITE   = "\033[97m"
     RESET   = "\033[0m"
 
+# Tick result row, built once: tick, iron, wood, fish, pyth change, event
+TICK_ROW_FMT = (f"\n  {C.BOLD}Tick %2d{C.RESET}  {C.WHITE}%6s{C.RESET}  {C.GREEN}%6s{C.RESET}"
+                f"  {C.CYAN}%6s{C.RESET}  {C.MAGENTA}%10s{C.RESET}  {C.YELLOW}%s{C.RESET}")
+
 def banner(text, color=C.CYAN):
     width = 62
     print(f"\n{color}{C.BOLD}{'═' * width}")
@@ -120,73 +139,185 @@ def highlight(text):
 def pause(seconds=2):
     time.sleep(seconds)
 
+async def apause(seconds=2):
+    await asyncio.sleep(seconds)
+
 
 # ─── SOL Balance Helpers ─────────────────────────────────────────────
-def get_balance_sol(address: str) -> float:
-    resp = requests.post(RPC_URL, json={
-        "jsonrpc": "2.0", "id": 1,
-        "method": "getBalance",
-        "params": [address]
-    }, timeout=15)
-    lamports = resp.json().get("result", {}).get("value", 0)
-    return lamports / LAMPORTS_PER_SOL
-
-def fetch_all_balances() -> dict:
-    balances = {"Treasury": get_balance_sol(TREASURY_PUBKEY)}
-    for bot in BOTS:
-        balances[bot["name"]] = get_balance_sol(bot["wallet"])
-    return balances
+async def fetch_all_balances(session: aiohttp.ClientSession) -> dict:
+    """Fetch treasury + bot balances in a single JSON-RPC batch request."""
+    wallets = [("Treasury", TREASURY_PUBKEY), *WALLET_BY_NAME.items()]
+    payload = [
+        {"jsonrpc": "2.0", "id": i, "method": "getBalance", "params": [addr]}
+        for i, (_, addr) in enumerate(wallets)
+    ]
+    async with session.post(RPC_URL, json=payload,
+                            timeout=aiohttp.ClientTimeout(total=15)) as r:
+        resp = await r.json(loads=orjson.loads, content_type=None)
+    # Batch replies may come back in any order; match them by id. A JSON-RPC
+    # error object (e.g. a 429 body) is a dict, not a list: report 0 balances.
+    if not isinstance(resp, list):
+        resp = []
+    lamports = {r.get("id"): (r.get("result") or {}).get("value", 0) for r in resp}
+    return {name: lamports.get(i, 0) / LAMPORTS_PER_SOL for i, (name, _) in enumerate(wallets)}
 
 def print_balances(balances: dict):
     for name, sol in balances.items():
-        icon = "🏦" if name == "Treasury" else next((b["emoji"] for b in BOTS if b["name"] == name), "")
+        icon = "🏦" if name == "Treasury" else EMOJI_BY_NAME.get(name, "")
         print(f"  {icon} {name:<15} {C.WHITE}{C.BOLD}{sol:.9f} SOL{C.RESET}")
 
 
+# ─── World API Helpers ───────────────────────────────────────────────
+async def get_json(session: aiohttp.ClientSession, url: str) -> dict:
+    async with session.get(url) as resp:
+        return await resp.json(loads=orjson.loads)
+
+async def post_action(session: aiohttp.ClientSession, wallet: str, decision: dict) -> dict:
+    async with session.post(f"{API_URL}/action",
+        json={"actor": wallet, **decision},
+        headers={"X-Wallet": wallet}) as resp:
+        return await resp.json(loads=orjson.loads)
+
+
 # ═══════════════════════════════════════════════════════════════════
 #                   LLM CLIENT (OpenRouter)
 # ═══════════════════════════════════════════════════════════════════
+def state_cache_key(kind: str, agent_name: str, state: dict, prices: dict) -> str:
+    """Digest of an agent's state, coarse enough that near-identical ticks share a key."""
+    region = state.get("region", "dock")
+    energy = state.get("energy", 0)
+    credits = state.get("credits", 0)
+    inventory = state.get("inventory", {})
+    raw = (f"{kind}|{agent_name}|{region}|{energy // 10}|{credits // 50}|"
+           f"{sorted(inventory.items())}|{sorted(prices.items())}")
+    return hashlib.blake2b(raw.encode()).hexdigest()
+
+
+def json_object_prefix(text: str) -> Optional[str]:
+    """Return the first complete {...} object in text, or None if it is still open."""
+    start = text.find("{")
+    if start < 0:
+        return None
+    depth = 0
+    in_str = escaped = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_str:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_str = False
+        elif ch == '"':
+            in_str = True
+        elif ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return None
+
+
 class LLMClient:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, max_concurrent: int = 5):
         self.api_key = api_key
         self.enabled = bool(api_key)
+        self._headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+            "HTTP-Referer": "https://portsol.world",
+            "X-Title": "Port Sol Agent"
+        }
+        # Caps in-flight OpenRouter requests so concurrent agents don't trip rate limits
+        self.sem = asyncio.Semaphore(max_concurrent)
+        # Replies keyed by a quantized state digest (see state_cache_key)
+        self._cache: dict[str, str] = {}
 
     async def generate(self, session: aiohttp.ClientSession,
                        system_prompt: str, user_prompt: str,
-                       max_tokens: int = 200) -> Optional[str]:
+                       max_tokens: int = 200,
+                       cache_key: Optional[str] = None,
+                       temperature: float = 0.8,
+                       stream_json: bool = False) -> Optional[str]:
+        """
+        Return the model reply, or None on failure.
+        With stream_json the reply is streamed and the connection dropped as soon
+        as a complete JSON object has arrived.
+        """
         if not self.enabled:
             return None
+        if cache_key and cache_key in self._cache:
+            return self._cache[cache_key]
         try:
-            async with session.post(
-                OPENROUTER_URL,
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json",
-                    "HTTP-Referer": "https://portsol.world",
-                    "X-Title": "Port Sol Agent"
-                },
-                json={
-                    "model": OPENROUTER_MODEL,
-                    "messages": [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt}
-                    ],
-                    "max_tokens": max_tokens,
-                    "temperature": 0.8
-                }
-            ) as resp:
-                if resp.status == 200:
-                    data = await resp.json()
-                    return data["choices"][0]["message"]["content"].strip()
-                else:
-                    return None
-        except:
+            for attempt in range(2):
+                async with self.sem:
+                    async with session.post(
+                        OPENROUTER_URL,
+                        headers=self._headers,
+                        json={
+                            "model": OPENROUTER_MODEL,
+                            "messages": [
+                                {"role": "system", "content": system_prompt},
+                                {"role": "user", "content": user_prompt}
+                            ],
+                            "max_tokens": max_tokens,
+                            "temperature": temperature,
+                            "stream": stream_json
+                        }
+                    ) as resp:
+                        if resp.status == 200:
+                            if stream_json:
+                                text = await self._read_json_stream(resp)
+                            else:
+                                data = await resp.json(loads=orjson.loads)
+                                text = data["choices"][0]["message"]["content"].strip()
+                            if cache_key:
+                                self._cache[cache_key] = text
+                            return text
+                        if resp.status != 429 or attempt > 0:
+                            return None
+                        retry_after = float(resp.headers.get("Retry-After", 1))
+                # Rate limited: wait outside the semaphore, then retry once
+                await asyncio.sleep(retry_after)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError, KeyError, IndexError) as e:
+            # ValueError covers bad JSON bodies and a malformed Retry-After header
+            log.warning("LLM request failed: %r", e)
             return None
 
+    @staticmethod
+    async def _read_json_stream(resp: aiohttp.ClientResponse) -> str:
+        """Accumulate SSE deltas until a JSON object is complete, then abort the stream."""
+        buf = ""
+        async for line in resp.content:
+            line = line.strip()
+            if not line.startswith(b"data: "):
+                continue  # blank keep-alives and ": OPENROUTER PROCESSING" comments
+            data = line[6:]
+            if data == b"[DONE]":
+                break
+            choices = orjson.loads(data).get("choices") or [{}]
+            buf += choices[0].get("delta", {}).get("content") or ""
+            obj = json_object_prefix(buf)
+            if obj is not None:
+                resp.close()  # stop paying for tokens after the closing brace
+                return obj
+        return buf.strip()
+
 
 # ═══════════════════════════════════════════════════════════════════
 #                   LLM-POWERED AGENT
 # ═══════════════════════════════════════════════════════════════════
+STRATEGY_TAIL = """STRATEGY TO EARN CREDITS:
+1. If you have resources AND at market -> SELL THEM with place_order
+2. If you have resources but NOT at market -> move to market
+3. If no resources -> go harvest at dock/mine/forest
+4. If AP < 20 -> rest
+
+RESPOND WITH ONLY JSON, nothing else!"""
+
+
 class LLMAgent:
     def __init__(self, config: dict, llm: LLMClient):
         self.name = config["name"]
@@ -194,17 +325,11 @@ class LLMAgent:
         self.emoji = config["emoji"]
         self.personality = config["personality"]
         self.llm = llm
+        # Where the fallback heuristic harvests (TraderBot harvests wherever it is)
+        self._home_region = {"MinerBot": "mine", "GovernorBot": "dock"}.get(self.name)
 
-    async def decide_action(self, session: aiohttp.ClientSession,
-                            state: dict, world_state: dict) -> Optional[dict]:
-        region = state.get("region", "dock")
-        energy = state.get("energy", 0)
-        credits = state.get("credits", 0)
-        inventory = state.get("inventory", {})
-        prices = world_state.get("market_prices", {"iron": 15, "wood": 12, "fish": 8})
-        inv_str = ", ".join(f"{k}:{v}" for k, v in inventory.items() if v > 0) or "empty"
-
-        system_prompt = f"""{self.personality}
+        # Static prompt parts are built once; only market prices change per tick
+        self._system_prefix = f"""{self.personality}
 
 GAME RULES - Port Sol Trading Game:
 - You start with 1000 credits
@@ -222,20 +347,36 @@ ACTIONS (choose ONE):
 3. place_order - SELL resources at market. JSON: {{"action": "place_order", "params": {{"resource": "iron"|"wood"|"fish", "side": "sell", "quantity": NUMBER}}}}
 4. rest - Recover AP. JSON: {{"action": "rest", "params": {{}}}}
 
-COSTS: move=5AP, harvest=10AP, place_order=3AP, rest=0AP
+COSTS: move=5AP, harvest=10AP, place_order=3AP, rest=0AP"""
+
+        self._comment_system_prompt = f"""{self.personality}
+
+Write a SHORT status update (2-3 sentences). Show personality!
+MUST include your actual stats: credits, items, location.
+Be creative and in character."""
+
+    async def decide_action(self, session: aiohttp.ClientSession,
+                            state: dict, world_state: dict) -> Optional[dict]:
+        region = state.get("region", "dock")
+        energy = state.get("energy", 0)
+        credits = state.get("credits", 0)
+        inventory = state.get("inventory", {})
+        prices = world_state.get("market_prices", {"iron": 15, "wood": 12, "fish": 8})
+        inv_str = ", ".join(f"{k}:{v}" for k, v in inventory.items() if v > 0) or "empty"
+
+        if SKIP_LLM_ON_OBVIOUS and (
+            energy < 15 or (region == "market" and any(q > 0 for q in inventory.values()))
+        ):
+            return self._fallback(state, world_state)
+
+        system_prompt = self._system_prefix + f"""
 
 CURRENT MARKET PRICES:
 - Iron: {prices.get('iron', 15)} credits per unit
 - Wood: {prices.get('wood', 12)} credits per unit
 - Fish: {prices.get('fish', 8)} credits per unit
 
-STRATEGY TO EARN CREDITS:
-1. If you have resources AND at market -> SELL THEM with place_order
-2. If you have resources but NOT at market -> move to market
-3. If no resources -> go harvest at dock/mine/forest
-4. If AP < 20 -> rest
-
-RESPOND WITH ONLY JSON, nothing else!"""
+{STRATEGY_TAIL}"""
 
         user_prompt = f"""YOUR STATUS:
 - Location: {region}
@@ -248,20 +389,25 @@ MARKET PRICES: Iron={prices.get('iron',15)}, Wood={prices.get('wood',12)}, Fish=
 What action? Return JSON only:"""
 
         if self.llm.enabled:
-            response = await self.llm.generate(session, system_prompt, user_prompt, 150)
+            key = state_cache_key("decide", self.name, state, prices)
+            # The reply is a ~40-token JSON object, so cap generation and keep it deterministic
+            response = await self.llm.generate(session, system_prompt, user_prompt, 60,
+                                               cache_key=key, temperature=0.2,
+                                               stream_json=True)
             if response:
                 try:
                     clean = response.strip()
                     if "```" in clean:
                         clean = clean.split("```")[1].replace("json", "").strip()
-                    decision = json.loads(clean)
+                    decision = orjson.loads(clean)
                     action = decision.get("action")
                     params = decision.get("params", {})
                     if action == "place_order" and "quantity" in params:
                         params["quantity"] = int(params["quantity"])
                     if action:
                         return {"action": action, "params": params}
-                except:
+                except (orjson.JSONDecodeError, ValueError, TypeError, AttributeError):
+                    # Malformed or non-object reply (or non-numeric quantity): use fallback
                     pass
 
         # Fallback
@@ -274,22 +420,18 @@ What action? Return JSON only:"""
 
         if energy < 20:
             return {"action": "rest", "params": {}}
-        if region == "market":
+        total_items = sum(inventory.values())
+        if region == "market" and total_items > 0:
             for resource, qty in inventory.items():
                 if qty > 0:
                     return {"action": "place_order", "params": {"resource": resource, "side": "sell", "quantity": qty}}
-        total_items = sum(inventory.values())
         if total_items >= 5 and region != "market":
             return {"action": "move", "params": {"target": "market"}}
-        if self.name == "MinerBot":
-            if region != "mine":
-                return {"action": "move", "params": {"target": "mine"}}
-        elif self.name == "GovernorBot":
-            if region != "dock":
-                return {"action": "move", "params": {"target": "dock"}}
-        else:
-            if region in ("market",):
-                return {"action": "move", "params": {"target": "mine"}}
+        if self._home_region:
+            if region != self._home_region:
+                return {"action": "move", "params": {"target": self._home_region}}
+        elif region == "market":
+            return {"action": "move", "params": {"target": "mine"}}
         return {"action": "harvest", "params": {}}
 
     async def generate_comment(self, session: aiohttp.ClientSession,
@@ -302,12 +444,6 @@ What action? Return JSON only:"""
         total_items = sum(inventory.values())
         inv_str = ", ".join(f"{v} {k}" for k, v in inventory.items() if v > 0) or "nothing"
 
-        system_prompt = f"""{self.personality}
-
-Write a SHORT status update (2-3 sentences). Show personality!
-MUST include your actual stats: credits, items, location.
-Be creative and in character."""
-
         user_prompt = f"""Tick {tick} - Write your status comment:
 - Location: {region}
 - Energy: {energy}/100
@@ -318,7 +454,9 @@ Be creative and in character."""
 Write a fun comment:"""
 
         if self.llm.enabled:
-            comment = await self.llm.generate(session, system_prompt, user_prompt, 150)
+            key = state_cache_key("comment", self.name, state, prices)
+            comment = await self.llm.generate(session, self._comment_system_prompt, user_prompt, 150,
+                                              cache_key=key)
             if comment and len(comment) > 10:
                 return comment.strip('"').strip()
 
@@ -354,15 +492,25 @@ async def main():
     llm = LLMClient(OPENROUTER_API_KEY)
     agents = [LLMAgent(bot, llm) for bot in BOTS]
 
-    async with aiohttp.ClientSession() as http:
+    # One pooled session for LLM, world API and RPC calls; keep-alive avoids
+    # a TLS handshake per OpenRouter request
+    connector = aiohttp.TCPConnector(limit=64, limit_per_host=16,
+                                     ttl_dns_cache=300, keepalive_timeout=60)
+    timeout = aiohttp.ClientTimeout(total=60, connect=10)
+    async with aiohttp.ClientSession(
+        connector=connector, timeout=timeout,
+        json_serialize=lambda obj: orjson.dumps(obj).decode(),
+    ) as http:
 
         # ═══════════════════════════════════════════════════════════
         # PHASE 1: PYTH ORACLE
         # ═══════════════════════════════════════════════════════════
         banner("PHASE 1: PYTH ORACLE — Real-Time SOL/USD Price", C.MAGENTA)
-        pause(1)
+        await apause(1)
         try:
-            pyth_resp = requests.get(f"{API_URL}/pyth/price", timeout=10).json()
+            async with http.get(f"{API_URL}/pyth/price",
+                                timeout=aiohttp.ClientTimeout(total=10)) as resp:
+                pyth_resp = await resp.json(loads=orjson.loads)
             sol_price = pyth_resp.get("price")
             if sol_price:
                 highlight(f"SOL/USD = ${sol_price:.2f}  (from Pyth Network Hermes API)")
@@ -373,59 +521,62 @@ async def main():
                 info("Pyth price not available — using fallback")
         except Exception as e:
             info(f"Pyth: {e}")
-        pause(3)
+        await apause(3)
 
         # ═══════════════════════════════════════════════════════════
         # PHASE 2: PRE-TEST ON-CHAIN BALANCES
         # ═══════════════════════════════════════════════════════════
         banner("PHASE 2: ON-CHAIN BALANCES (Before Game)", C.BLUE)
-        pause(1)
+        await apause(1)
         section("Reading Solana devnet balances...")
-        pre_balances = fetch_all_balances()
+        pre_balances = await fetch_all_balances(http)
         print_balances(pre_balances)
-        pause(3)
+        await apause(3)
 
         # ═══════════════════════════════════════════════════════════
         # PHASE 3: SOL DEPOSIT
         # ═══════════════════════════════════════════════════════════
         banner(f"PHASE 3: SOL DEPOSIT — {entry_fee_sol} SOL per agent", C.GREEN)
-        pause(1)
+        await apause(1)
         section("Each AI agent pays SOL to the treasury to enter the world...")
 
-        for bot in BOTS:
+        # enter_world is blocking RPC work, so run all deposits side by side in threads
+        info(f"Sending {entry_fee_sol} SOL → Treasury from {len(BOTS)} wallets in parallel...")
+        clients = [PortSolClient(API_URL, b["wallet"], b["keypair"]) for b in BOTS]
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(*[loop.run_in_executor(None, c.enter_world) for c in clients])
+
+        for bot, (ok, result) in zip(BOTS, results):
             print(f"\n  {bot['emoji']} {C.BOLD}{bot['name']}{C.RESET} ({bot['role']})")
             info(f"Wallet: {bot['wallet'][:24]}...")
-            info(f"Sending {entry_fee_sol} SOL → Treasury...")
-            client = PortSolClient(API_URL, bot["wallet"], bot["keypair"])
-            ok, result = client.enter_world()
             if ok:
                 success(f"TX confirmed: {result[:40]}...")
             else:
                 print(f"  {C.YELLOW}⚠ {result}{C.RESET}")
-            time.sleep(3)
 
-        pause(2)
+        await apause(2)
         section("Post-deposit balances:")
-        post_entry = fetch_all_balances()
+        post_entry = await fetch_all_balances(http)
         print_balances(post_entry)
 
         treasury_gained = post_entry["Treasury"] - pre_balances["Treasury"]
         if treasury_gained > 0:
             highlight(f"Treasury received +{treasury_gained:.6f} SOL from {len(BOTS)} agents")
-        pause(3)
+        await apause(3)
 
         # ═══════════════════════════════════════════════════════════
         # PHASE 4: LLM GAME — with Moltbook dry-run
         # ═══════════════════════════════════════════════════════════
         banner(f"PHASE 4: LLM GAME — {NUM_TICKS} Ticks (Gemini 3 Flash)", C.YELLOW)
-        pause(1)
+        await apause(1)
 
         # Reset world for clean demo
         try:
             async with http.post(f"{API_URL}/debug/reset_world") as resp:
-                await resp.json()
+                await resp.json(loads=orjson.loads)
             success("World reset to tick 0")
-        except:
+        except HTTP_ERRORS as e:
+            log.warning("reset_world failed: %r", e)
             info("Could not reset (non-debug mode)")
 
         # Register agents
@@ -434,11 +585,11 @@ async def main():
             try:
                 async with http.post(f"{API_URL}/register",
                     json={"wallet": bot["wallet"], "name": bot["name"]}) as resp:
-                    await resp.json()
+                    await resp.json(loads=orjson.loads)
                 success(f"{bot['emoji']} {bot['name']} — {bot['role']}")
-            except:
-                pass
-        pause(1)
+            except HTTP_ERRORS as e:
+                log.warning("register %s failed: %r", bot["name"], e)
+        await apause(1)
 
         # Moltbook dry-run: initial post
         section("[Moltbook DRY-RUN] Creating game post...")
@@ -447,7 +598,7 @@ async def main():
         print(f"  {C.DIM}   AI agents powered by Gemini 3 Flash competing!{C.RESET}")
         print(f"  {C.DIM}   MinerBot: 1000cr | TraderBot: 1000cr | GovernorBot: 1000cr{C.RESET}")
         print(f"  {C.DIM}──────────────────────────────────────────────────{C.RESET}")
-        pause(2)
+        await apause(2)
 
         # Game loop
         section(f"Running {NUM_TICKS} ticks with LLM decisions...")
@@ -457,41 +608,64 @@ async def main():
         for tick in range(NUM_TICKS):
             # Get world state
             async with http.get(f"{API_URL}/world/state") as resp:
-                world_state = await resp.json()
+                world_state = await resp.json(loads=orjson.loads)
+
+            # Each LLM agent decides + acts concurrently; rows print in agent order
+            states = await asyncio.gather(
+                *[get_json(http, f"{API_URL}/agent/{a.wallet}/state") for a in agents],
+                return_exceptions=True,
+            )
+            outcomes = {}
+            turns = []
+            for agent, state in zip(agents, states):
+                if isinstance(state, Exception):
+                    outcomes[agent.name] = state
+                elif "error" not in state:
+                    turns.append((agent, state))
+
+            decisions = await asyncio.gather(
+                *[a.decide_action(http, st, world_state) for a, st in turns],
+                return_exceptions=True,
+            )
+            plays = []
+            for (agent, _), decision in zip(turns, decisions):
+                if isinstance(decision, Exception):
+                    outcomes[agent.name] = decision
+                elif decision:
+                    plays.append((agent, decision))
+
+            results = await asyncio.gather(
+                *[post_action(http, a.wallet, d) for a, d in plays],
+                return_exceptions=True,
+            )
+            for (agent, decision), result in zip(plays, results):
+                outcomes[agent.name] = result if isinstance(result, Exception) else (decision, result)
 
-            # Each LLM agent decides + acts
             for agent in agents:
-                try:
-                    async with http.get(f"{API_URL}/agent/{agent.wallet}/state") as resp:
-                        state = await resp.json()
-                    if "error" in state:
-                        continue
-
-                    decision = await agent.decide_action(http, state, world_state)
-                    if decision:
-                        async with http.post(f"{API_URL}/action",
-                            json={"actor": agent.wallet, **decision},
-                            headers={"X-Wallet": agent.wallet}) as resp:
-                            result = await resp.json()
-                            action_str = decision["action"]
-                            params = decision.get("params", {})
-                            if result.get("success"):
-                                detail = ""
-                                if action_str == "place_order":
-                                    detail = f" {params.get('side','')} {params.get('quantity','')} {params.get('resource','')}"
-                                elif action_str == "move":
-                                    detail = f" → {params.get('target','')}"
-                                print(f"    {agent.emoji} {agent.name:<13} {C.GREEN}{action_str}{detail}{C.RESET}")
-                            else:
-                                msg = result.get("message", "")[:40]
-                                print(f"    {agent.emoji} {agent.name:<13} {C.RED}{action_str} FAIL: {msg}{C.RESET}")
-                except Exception as e:
-                    print(f"    {agent.emoji} {agent.name:<13} {C.RED}Error: {e}{C.RESET}")
+                outcome = outcomes.get(agent.name)
+                if outcome is None:
+                    continue
+                if isinstance(outcome, Exception):
+                    print(f"    {agent.emoji} {agent.name:<13} {C.RED}Error: {outcome}{C.RESET}")
+                    continue
+                decision, result = outcome
+                action_str = decision["action"]
+                params = decision.get("params", {})
+                if result.get("success"):
+                    detail = ""
+                    if action_str == "place_order":
+                        detail = f" {params.get('side','')} {params.get('quantity','')} {params.get('resource','')}"
+                    elif action_str == "move":
+                        detail = f" → {params.get('target','')}"
+                    print(f"    {agent.emoji} {agent.name:<13} {C.GREEN}{action_str}{detail}{C.RESET}")
+                else:
+                    msg = result.get("message", "")[:40]
+                    print(f"    {agent.emoji} {agent.name:<13} {C.RED}{action_str} FAIL: {msg}{C.RESET}")
 
             # Advance tick
             try:
                 async with http.post(f"{API_URL}/debug/advance_tick") as resp:
-                    td = await resp.json()
+                    td = await resp.json(loads=orjson.loads)
                 prices = td.get("market_prices", {})
                 events = td.get("events", [])
                 pyth = td.get("pyth_oracle", {})
@@ -508,34 +682,32 @@ async def main():
                 wood = prices.get("wood", "?")
                 fish = prices.get("fish", "?")
 
-                iron_s = f"{iron:>6}" if isinstance(iron, (int, float)) else f"{'?':>6}"
-                wood_s = f"{wood:>6}" if isinstance(wood, (int, float)) else f"{'?':>6}"
-                fish_s = f"{fish:>6}" if isinstance(fish, (int, float)) else f"{'?':>6}"
+                iron_s = iron if isinstance(iron, (int, float)) else "?"
+                wood_s = wood if isinstance(wood, (int, float)) else "?"
+                fish_s = fish if isinstance(fish, (int, float)) else "?"
 
-                print(f"\n  {C.BOLD}Tick {tick+1:>2}{C.RESET}  {C.WHITE}{iron_s}{C.RESET}  {C.GREEN}{wood_s}{C.RESET}  {C.CYAN}{fish_s}{C.RESET}  {C.MAGENTA}{pyth_str:>10}{C.RESET}  {C.YELLOW}{event_str}{C.RESET}")
+                print(TICK_ROW_FMT % (tick + 1, iron_s, wood_s, fish_s, pyth_str, event_str))
             except Exception as e:
                 print(f"  Tick {tick+1:>2}  Error: {e}")
 
             # Moltbook dry-run comment from one random agent each tick
             if tick % 3 == 0:  # Comment every 3 ticks
                 agent = agents[tick % len(agents)]
-                try:
-                    async with http.get(f"{API_URL}/agent/{agent.wallet}/state") as resp:
-                        astate = await resp.json()
+                # Reuse the state fetched at the start of this tick
+                astate = states[tick % len(agents)]
+                if isinstance(astate, dict) and "error" not in astate:
                     comment = await agent.generate_comment(http, astate, world_state, tick+1)
                     print(f"  {C.DIM}  💬 [Moltbook DRY-RUN] {agent.name}: {comment[:80]}...{C.RESET}")
-                except:
-                    pass
 
-            pause(1)
+            await apause(1)
 
-        pause(2)
+        await apause(2)
 
         # ═══════════════════════════════════════════════════════════
         # PHASE 5: FINAL STANDINGS + SETTLEMENT
         # ═══════════════════════════════════════════════════════════
         banner("PHASE 5: FINAL STANDINGS", C.CYAN)
-        pause(1)
+        await apause(1)
 
         agent_credits = {}
         total_credits = 0
@@ -546,7 +718,7 @@ async def main():
         for bot in BOTS:
             try:
                 async with http.get(f"{API_URL}/agent/{bot['wallet']}/state") as resp:
-                    s = await resp.json()
+                    s = await resp.json(loads=orjson.loads)
                 cr = s.get("credits", 1000)
                 inv = s.get("inventory", {})
                 items = sum(inv.values()) if isinstance(inv, dict) else 0
@@ -554,48 +726,45 @@ async def main():
                 agent_credits[bot["name"]] = {"credits": cr, "wallet": bot["wallet"], "items": items, "inv": inv}
                 total_credits += cr
                 print(f"  {bot['emoji']} {bot['name']:<13} {C.BOLD}{cr:>8}{C.RESET} {items:>6} {region:>8}")
-            except:
+            except HTTP_ERRORS as e:
+                log.warning("state for %s failed: %r", bot["name"], e)
                 agent_credits[bot["name"]] = {"credits": 1000, "wallet": bot["wallet"], "items": 0, "inv": {}}
                 total_credits += 1000
 
         # Force-sell remaining inventory
         section("Final settlement: selling remaining inventory...")
-        for bot in BOTS:
+        async def sell(wallet: str, res: str, qty: int) -> tuple:
+            r = await post_action(http, wallet, {"action": "place_order",
+                                                 "params": {"resource": res, "side": "sell", "quantity": qty}})
+            return res, qty, r
+
+        async def settle(bot: dict) -> tuple:
+            wallet = bot["wallet"]
+            astate = await get_json(http, f"{API_URL}/agent/{wallet}/state")
+            if astate.get("region") != "market":
+                await post_action(http, wallet, {"action": "move", "params": {"target": "market"}})
+            # Sell every resource at once now that the agent is at market
+            inv = astate.get("inventory", {})
+            sales = await asyncio.gather(*[sell(wallet, res, qty) for res, qty in inv.items() if qty > 0])
+            new_s = await get_json(http, f"{API_URL}/agent/{wallet}/state")
+            return bot, sales, new_s
+
+        to_settle = [b for b in BOTS if agent_credits[b["name"]]["items"] > 0]
+        for bot, sales, new_s in await asyncio.gather(*[settle(b) for b in to_settle]):
+            for res, qty, r in sales:
+                if r.get("success"):
+                    success(f"{bot['name']}: sold {qty} {res}")
             info_d = agent_credits[bot["name"]]
-            if info_d["items"] > 0:
-                wallet = info_d["wallet"]
-                # Move to market
-                async with http.get(f"{API_URL}/agent/{wallet}/state") as resp:
-                    astate = await resp.json()
-                if astate.get("region") != "market":
-                    async with http.post(f"{API_URL}/action",
-                        json={"actor": wallet, "action": "move", "params": {"target": "market"}},
-                        headers={"X-Wallet": wallet}) as resp:
-                        await resp.json()
-                # Sell everything
-                inv = astate.get("inventory", {})
-                for res, qty in inv.items():
-                    if qty > 0:
-                        async with http.post(f"{API_URL}/action",
-                            json={"actor": wallet, "action": "place_order",
-                                  "params": {"resource": res, "side": "sell", "quantity": qty}},
-                            headers={"X-Wallet": wallet}) as resp:
-                            r = await resp.json()
-                            if r.get("success"):
-                                success(f"{bot['name']}: sold {qty} {res}")
-                # Re-fetch
-                async with http.get(f"{API_URL}/agent/{wallet}/state") as resp:
-                    new_s = await resp.json()
-                agent_credits[bot["name"]]["credits"] = new_s.get("credits", info_d["credits"])
+            info_d["credits"] = new_s.get("credits", info_d["credits"])
 
         total_credits = sum(d["credits"] for d in agent_credits.values())
-        pause(2)
+        await apause(2)
 
         # ═══════════════════════════════════════════════════════════
         # PHASE 6: SOL SETTLEMENT
         # ═══════════════════════════════════════════════════════════
         banner(f"PHASE 6: SOL SETTLEMENT — Distributing {pool_sol} SOL", C.GREEN)
-        pause(1)
+        await apause(1)
 
         section("Converting in-game credits → on-chain SOL...")
         print(f"\n  {'Agent':<15} {'Credits':>8} {'Share':>8} {'SOL Payout':>14}")
@@ -604,41 +773,49 @@ async def main():
         for name, info_d in agent_credits.items():
             share = info_d["credits"] / total_credits if total_credits > 0 else 0
             payout = pool_sol * share
-            emoji = next((b["emoji"] for b in BOTS if b["name"] == name), "")
+            emoji = EMOJI_BY_NAME.get(name, "")
             print(f"  {emoji} {name:<13} {info_d['credits']:>8} {share:>7.1%} {C.GREEN}{C.BOLD}{payout:>12.6f} SOL{C.RESET}")
         print(f"  {'─'*50}")
         print(f"  {'TOTAL':<17} {total_credits:>8} {'100%':>8} {pool_sol:>12.6f} SOL")
-        pause(3)
+        await apause(3)
 
         # Execute on-chain transfers
         section("Sending SOL from treasury → agents on Solana devnet...")
         gate = get_gate_client()
         treasury_keypair_bytes = bytes(json.loads(TREASURY_KEYPAIR))
 
+        payouts = []
         for name, info_d in agent_credits.items():
             share = info_d["credits"] / total_credits if total_credits > 0 else 0
             payout_lamports = int(ENTRY_FEE_LAMPORTS * len(BOTS) * share)
-            payout_sol = payout_lamports / LAMPORTS_PER_SOL
-            emoji = next((b["emoji"] for b in BOTS if b["name"] == name), "")
-
             if payout_lamports > 0:
-                ok, result = gate.send_sol(treasury_keypair_bytes, info_d["wallet"], payout_lamports)
-                if ok:
-                    success(f"{emoji} {name}: {payout_sol:.6f} SOL → TX {result[:32]}...")
-                else:
-                    print(f"  {C.RED}✗ {name}: FAILED - {result}{C.RESET}")
-                time.sleep(3)
+                payouts.append((name, info_d["wallet"], payout_lamports))
+
+        # send_sol blocks on RPC confirmation, so run the transfers side by side in threads
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(*[
+            loop.run_in_executor(None, gate.send_sol, treasury_keypair_bytes, wallet, lamports)
+            for _, wallet, lamports in payouts
+        ])
+
+        for (name, _, payout_lamports), (ok, result) in zip(payouts, results):
+            payout_sol = payout_lamports / LAMPORTS_PER_SOL
+            emoji = EMOJI_BY_NAME.get(name, "")
+            if ok:
+                success(f"{emoji} {name}: {payout_sol:.6f} SOL → TX {result[:32]}...")
+            else:
+                print(f"  {C.RED}✗ {name}: FAILED - {result}{C.RESET}")
 
-        pause(3)
+        await apause(3)
 
         # ═══════════════════════════════════════════════════════════
         # PHASE 7: FINAL VERIFICATION
         # ═══════════════════════════════════════════════════════════
         banner("PHASE 7: ON-CHAIN VERIFICATION", C.BLUE)
-        pause(2)
+        await apause(2)
 
         section("Final Solana devnet balances...")
-        post_balances = fetch_all_balances()
+        post_balances = await fetch_all_balances(http)
         print_balances(post_balances)
 
         print(f"\n  {C.BOLD}{'Wallet':<15} {'Before':>12} {'After':>12} {'Change':>12}{C.RESET}")
@@ -649,7 +826,7 @@ async def main():
             change = after - before
             sign = "+" if change >= 0 else ""
             color = C.GREEN if change > 0 else C.RED if change < 0 else C.DIM
-            emoji = "🏦" if name == "Treasury" else next((b["emoji"] for b in BOTS if b["name"] == name), "")
+            emoji = "🏦" if name == "Treasury" else EMOJI_BY_NAME.get(name, "")
             print(f"  {emoji} {name:<13} {before:>11.6f} {after:>11.6f} {color}{sign}{change:>10.6f}{C.RESET}")
 
         agent_changes = {}
@@ -662,7 +839,7 @@ async def main():
         print()
         highlight(f"🏆 WINNER: {winner} ({agent_changes[winner]:+.6f} SOL)")
         info(f"📉 Loser:  {loser} ({agent_changes[loser]:+.6f} SOL)")
-        pause(2)
+        await apause(2)
 
         # ═══════════════════════════════════════════════════════════
         # CLOSING
@@ -685,4 +862,5 @@ async def main():
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING, format="  [%(levelname)s] %(message)s")
     asyncio.run(main())
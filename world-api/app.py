@@ -1,19 +1,36 @@
 """Port Sol World API - FastAPI main entry (Solana-native)"""
 import os
+import gzip
+import asyncio
+import atexit
+import hashlib
+from contextlib import asynccontextmanager, suppress
 from pathlib import Path
+from functools import lru_cache
+from typing import BinaryIO, Dict, NamedTuple, Optional, Tuple
 
-# Load .env from project root BEFORE anything else
+# Load .env from project root BEFORE anything else.
+# Guarded so reloads/re-imports in the same process don't reparse it;
+# production deployments should set real env vars and PORTSOL_SKIP_DOTENV=1.
 from dotenv import load_dotenv
 env_path = Path(__file__).parent.parent / '.env'
-load_dotenv(env_path)
+if not os.environ.get("_PORTSOL_ENV_LOADED") and not os.environ.get("PORTSOL_SKIP_DOTENV"):
+    load_dotenv(env_path, override=False)
+    os.environ["_PORTSOL_ENV_LOADED"] = "1"
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import PlainTextResponse
 from fastapi.openapi.utils import get_openapi
+from fastapi.concurrency import run_in_threadpool
 
 from engine.state import get_world_engine
+from engine.blockchain import (
+    get_gate_client, get_pyth_feed, close_http_client, CHAIN_REFRESH_SECONDS,
+)
+from routes.responses import ORJSONResponse, dumps_json
+from middleware.moltbook import IdentityMiddleware
 
 # API metadata
 API_TITLE = "Port Sol World API"
@@ -46,7 +63,33 @@ Include your Solana wallet pubkey in the `X-Wallet` header.
 Read the skill file at `/skill.md` for AI agent integration.
 """
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    refresher = asyncio.create_task(_refresh_chain_data(app))
+    yield
+    refresher.cancel()
+    # Let the refresher unwind before its HTTP client goes away
+    with suppress(asyncio.CancelledError):
+        await refresher
+    await close_http_client()
+
+
+async def _refresh_chain_data(app: FastAPI):
+    """Keep Pyth price and reward pool in app.state so handlers never wait on Hermes/RPC."""
+    while True:
+        try:
+            gate = get_gate_client()
+            pyth = get_pyth_feed()
+            app.state.cached_sol_usd = await pyth.get_sol_usd_price_async()
+            app.state.cached_pool = await run_in_threadpool(gate.get_reward_pool)
+        except Exception as e:
+            print(f"Chain data refresh error: {e}")
+        await asyncio.sleep(CHAIN_REFRESH_SECONDS)
+
+
 app = FastAPI(
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     title=API_TITLE,
     description=API_DESCRIPTION,
     version=API_VERSION,
@@ -55,13 +98,21 @@ app = FastAPI(
     openapi_url="/openapi.json"
 )
 
-# CORS middleware
+# Resolve agent identity once per request for /register and /action
+app.add_middleware(IdentityMiddleware)
+
+# CORS middleware: explicit allowlists (comma-separated CORS_ORIGINS) instead of
+# wildcards, so responses carry a fixed Allow-Origin rather than echoing Origin
+_ALLOWED_ORIGINS = [
+    o.strip() for o in os.getenv("CORS_ORIGINS", "http://localhost:8000").split(",") if o.strip()
+]
+_ALLOWED_HEADERS = ["content-type", "x-wallet", "x-moltbook-identity"]
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=_ALLOWED_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "DELETE"],
+    allow_headers=_ALLOWED_HEADERS,
 )
 
 # Mount static files for dashboard
@@ -69,29 +120,191 @@ static_dir = Path(__file__).parent / "static"
 if static_dir.exists():
     app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
 
+_SKILL_PATH = (Path(__file__).parent.parent / "openclaw" / "SKILL.md").resolve()
+
+# Immutable pages served from memory: name -> (path, media type)
+_STATIC_FILES = {
+    "dashboard": (static_dir / "index.html", "text/html"),
+    "game": (static_dir / "game.html", "text/html"),
+    "game3d": (static_dir / "game3d.html", "text/html"),
+    "skill": (_SKILL_PATH, "text/markdown"),
+}
+# STATIC_RELOAD re-reads a page when its mtime changes, so edits show up without a restart
+_STATIC_RELOAD = os.getenv("STATIC_RELOAD", "").lower() in ("1", "true", "yes")
+
+
+def _pack_body(body: bytes, media_type: str) -> Tuple[bytes, str, str, bytes]:
+    """Precompute (body, media_type, etag, gzip body) for a cacheable response."""
+    etag = '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+    return body, media_type, etag, gzip.compress(body, 6)
+
+
+def _read_static(name: str) -> Optional[Tuple[bytes, str, str, bytes]]:
+    """Read, pack and cache a static file, or None if missing."""
+    path, media_type = _STATIC_FILES[name]
+    try:
+        mtime = path.stat().st_mtime_ns
+        body = path.read_bytes()
+    except FileNotFoundError:
+        _STATIC_CACHE.pop(name, None)
+        return None
+    entry = _pack_body(body, media_type)
+    _STATIC_CACHE[name] = entry
+    _STATIC_MTIMES[name] = mtime
+    return entry
+
+
+def _reload_static(name: str) -> Optional[Tuple[bytes, str, str, bytes]]:
+    """Return the cached entry, re-reading it first if the file changed (STATIC_RELOAD)."""
+    try:
+        mtime = _STATIC_FILES[name][0].stat().st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+    if name in _STATIC_CACHE and mtime == _STATIC_MTIMES.get(name):
+        return _STATIC_CACHE[name]
+    return _read_static(name)
+
+
+class StaticFile(NamedTuple):
+    """Open file behind a cached page, with the size/mtime its cached body was read at."""
+    file: BinaryIO
+    size: int
+    mtime_ns: int
+
+    @classmethod
+    def open(cls, path: Path) -> "StaticFile":
+        f = open(path, "rb")
+        st = os.fstat(f.fileno())
+        return cls(f, st.st_size, st.st_mtime_ns)
+
+    def unchanged(self) -> bool:
+        """True if the file on disk still matches what was cached (not edited in place)."""
+        st = os.fstat(self.file.fileno())
+        return st.st_size == self.size and st.st_mtime_ns == self.mtime_ns
+
+
+_STATIC_CACHE: Dict[str, Tuple[bytes, str, str, bytes]] = {}
+_STATIC_MTIMES: Dict[str, int] = {}
+# Open files for cached pages, used when the ASGI server supports zero-copy send
+app.state.static_files = {}
+# Filled by the lifespan refresher; None until the first refresh completes
+app.state.cached_sol_usd = None
+app.state.cached_pool = None
+for _name in _STATIC_FILES:
+    _entry = _read_static(_name)
+    if _entry and not _STATIC_RELOAD:
+        _static = StaticFile.open(_STATIC_FILES[_name][0])
+        # Only keep the handle if it is the same file version that was cached
+        if _static.size == len(_entry[0]) and _static.mtime_ns == _STATIC_MTIMES[_name]:
+            app.state.static_files[_name] = _static
+        else:
+            _static.file.close()
+
+
+@atexit.register
+def _close_static_files():
+    for static in app.state.static_files.values():
+        static.file.close()
+    app.state.static_files.clear()
+
+
+class ZeroCopyResponse(Response):
+    """
+    Cached static file response. Uses the ASGI http.response.zerocopysend
+    extension (kernel sendfile) when the server advertises it and the file
+    still matches the cached body, otherwise sends the in-memory bytes.
+    """
+
+    def __init__(self, static: Optional[StaticFile], content: bytes, media_type: str, headers: dict):
+        super().__init__(content=content, media_type=media_type, headers=headers)
+        self.static = static
+
+    async def __call__(self, scope, receive, send):
+        static = self.static
+        if (
+            static is None
+            or "http.response.zerocopysend" not in scope.get("extensions", {})
+            or static.size != len(self.body)
+            or not static.unchanged()  # edited in place: ETag/Content-Length describe the cached bytes
+        ):
+            await super().__call__(scope, receive, send)
+            return
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers,
+        })
+        await send({
+            "type": "http.response.zerocopysend",
+            "file": static.file,
+            "offset": 0,
+            "count": len(self.body),
+            "more_body": False,
+        })
+
+
+@lru_cache(maxsize=64)
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """True if Accept-Encoding allows gzip (by name or via *) with a non-zero q-value."""
+    wildcard = False
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        coding = coding.strip().lower()
+        if coding == "gzip":
+            return q > 0
+        if coding == "*":
+            wildcard = q > 0
+    return wildcard
+
+
+def _packed_response(request: Request, entry: Tuple[bytes, str, str, bytes],
+                     cache_control: str, static: Optional[StaticFile] = None) -> Response:
+    """Answer from a packed body: 304 on matching ETag, gzip if accepted, else identity."""
+    body, media_type, etag, gz = entry
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    if _accepts_gzip(request.headers.get("accept-encoding", "")):
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=gz, media_type=media_type, headers=headers)
+    return ZeroCopyResponse(static, content=body, media_type=media_type, headers=headers)
+
+
+async def _static_response(request: Request, name: str, missing):
+    """Serve a cached static file."""
+    if _STATIC_RELOAD:
+        # stat/read/gzip off the event loop
+        entry = await run_in_threadpool(_reload_static, name)
+    else:
+        entry = _STATIC_CACHE.get(name)
+    if entry is None:
+        return missing
+    return _packed_response(
+        request, entry, "public, max-age=3600", app.state.static_files.get(name)
+    )
+
 @app.get("/dashboard", include_in_schema=False)
-async def dashboard():
+async def dashboard(request: Request):
     """Serve the web dashboard"""
-    dashboard_file = static_dir / "index.html"
-    if dashboard_file.exists():
-        return FileResponse(str(dashboard_file))
-    return {"error": "Dashboard not found"}
+    return await _static_response(request, "dashboard", {"error": "Dashboard not found"})
 
 @app.get("/game", include_in_schema=False)
-async def game_view():
+async def game_view(request: Request):
     """Serve the Phaser game world view"""
-    game_file = static_dir / "game.html"
-    if game_file.exists():
-        return FileResponse(str(game_file))
-    return {"error": "Game view not found"}
+    return await _static_response(request, "game", {"error": "Game view not found"})
 
 @app.get("/game3d", include_in_schema=False)
-async def game3d_view():
+async def game3d_view(request: Request):
     """Serve the Three.js game world view"""
-    game_file = static_dir / "game3d.html"
-    if game_file.exists():
-        return FileResponse(str(game_file))
-    return {"error": "3D game view not found"}
+    return await _static_response(request, "game3d", {"error": "3D game view not found"})
 
 @app.get("/health")
 async def health():
@@ -118,18 +331,11 @@ async def root():
         "moltbook_auth": "/moltbook/auth-info"
     }
 
-@app.get("/world/meta")
-async def world_meta():
-    """World metadata: rules, fees, available actions"""
-    from engine.blockchain import get_gate_client, get_pyth_feed
-
+@lru_cache(maxsize=1)
+def _meta_static() -> dict:
+    """Invariant part of /world/meta (rules and Solana config are fixed after startup)"""
     gate = get_gate_client()
-    pyth = get_pyth_feed()
-    sol_price = pyth.get_sol_usd_price()
-
     return {
-        "entry_fee": gate.get_entry_fee_formatted(),
-        "entry_fee_lamports": gate.get_entry_fee(),
         "entry_duration_days": 7,
         "regions": ["dock", "market", "mine", "forest"],
         "resources": ["iron", "wood", "fish"],
@@ -145,17 +351,43 @@ async def world_meta():
         "solana": {
             "network": gate.network,
             "rpc": gate.rpc_url,
-            "treasury": str(gate.treasury_pubkey) if gate.treasury_pubkey else None,
-        },
-        "pyth": {
-            "sol_usd_price": sol_price,
-            "feed": "SOL/USD",
-            "source": "Pyth Network"
+            "treasury": gate.treasury_str,
         },
         "dashboard": "/dashboard",
         "game3d": "/game3d"
     }
 
+# Last packed /world/meta body, keyed by the (entry fee, SOL price) it was built with
+_meta_packed: Tuple[Optional[Tuple[int, Optional[float]]], Optional[Tuple[bytes, str, str, bytes]]] = (None, None)
+
+@app.get("/world/meta")
+async def world_meta(request: Request):
+    """World metadata: rules, fees, available actions"""
+    global _meta_packed
+
+    # Served from memory only; the background refresher keeps the price current
+    sol_price = app.state.cached_sol_usd
+    # The fee is read live: set_entry_fee() may change it at runtime
+    gate = get_gate_client()
+    key = (gate.get_entry_fee(), sol_price)
+
+    built_for, entry = _meta_packed
+    if entry is None or built_for != key:
+        body = dumps_json({
+            "entry_fee": gate.get_entry_fee_formatted(),
+            "entry_fee_lamports": gate.get_entry_fee(),
+            **_meta_static(),
+            "pyth": {
+                "sol_usd_price": sol_price,
+                "feed": "SOL/USD",
+                "source": "Pyth Network"
+            },
+        })
+        entry = _pack_body(body, "application/json")
+        _meta_packed = (key, entry)
+
+    return _packed_response(request, entry, "no-cache")
+
 @app.get("/world/state")
 async def world_state():
     """Public world state including tick, events, and market prices"""
@@ -172,15 +404,12 @@ async def agent_state(wallet: str):
     return agent.to_dict()
 
 @app.get("/skill.md", include_in_schema=False)
-async def skill_file():
+async def skill_file(request: Request):
     """Serve OpenClaw SKILL.md for AI agent integration"""
-    from fastapi.responses import PlainTextResponse
-    skill_path = os.path.join(os.path.dirname(__file__), "..", "openclaw", "SKILL.md")
-    try:
-        with open(skill_path, "r", encoding="utf-8") as f:
-            return PlainTextResponse(f.read(), media_type="text/markdown")
-    except FileNotFoundError:
-        return PlainTextResponse("# Port Sol Skill\n\nSkill file not found.", media_type="text/markdown")
+    return await _static_response(
+        request, "skill",
+        PlainTextResponse("# Port Sol Skill\n\nSkill file not found.", media_type="text/markdown"),
+    )
 
 # Import routes
 from routes.action import router as action_router
@@ -225,6 +454,19 @@ def custom_openapi():
 
 app.openapi = custom_openapi
 
+# FastAPI's own /openapi.json route re-encodes the cached schema on every hit;
+# replace it with one that serves a packed (ETag + gzip) body built once.
+app.router.routes[:] = [r for r in app.router.routes if getattr(r, "path", None) != app.openapi_url]
+app.state.openapi_packed = None
+
+@app.get(app.openapi_url, include_in_schema=False)
+async def openapi_json(request: Request):
+    """OpenAPI schema, serialized once"""
+    if app.state.openapi_packed is None:
+        body = dumps_json(app.openapi())
+        app.state.openapi_packed = _pack_body(body, "application/json")
+    return _packed_response(request, app.state.openapi_packed, "no-cache")
+
 if __name__ == "__main__":
     import uvicorn
     import socket
@@ -254,4 +496,21 @@ if __name__ == "__main__":
     print(f"   Dashboard: http://localhost:{port}/dashboard")
     print(f"   API Docs:  http://localhost:{port}/docs\n")
 
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    # World state, entries and caches live in process memory, so extra workers
+    # each get their own world. Only raise WORKERS once state moves to a shared
+    # store (e.g. Redis).
+    workers = int(os.getenv("WORKERS", "1")) or (os.cpu_count() or 1)
+    if workers > 1:
+        print(f"WARNING: WORKERS={workers} - in-memory world state is NOT shared between workers")
+
+    # loop/http "auto" pick uvloop and httptools when installed (uvicorn[standard])
+    uvicorn.run(
+        "app:app" if workers > 1 else app,
+        host="0.0.0.0",
+        port=port,
+        workers=workers,
+        loop="auto",
+        http="auto",
+        # Uvicorn's default (on); ACCESS_LOG=false drops per-request log lines
+        access_log=os.getenv("ACCESS_LOG", "true").lower() in ("1", "true", "yes"),
+    )
@@ -1,18 +1,20 @@
 """Blockchain integration - Solana-native (SOL gate + SPL token support)"""
 import os
-import json
-import struct
-import base64
-from pathlib import Path
-from typing import Optional, Tuple
-
+import sys
+import time
+import asyncio
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
 from solders.keypair import Keypair
 from solders.pubkey import Pubkey
+from solders.hash import Hash
 from solders.system_program import TransferParams, transfer
 from solders.transaction import Transaction
 from solders.message import Message
-from solders.commitment_config import CommitmentLevel
-from solders.rpc.responses import GetBalanceResp
 from solana.rpc.api import Client as SolanaClient
 from solana.rpc.commitment import Confirmed, Finalized
 from solana.rpc.types import TxOpts
@@ -24,10 +26,53 @@ LAMPORTS_PER_SOL = 1_000_000_000
 # Default entry fee: 0.01 SOL (for devnet testing)
 DEFAULT_ENTRY_FEE_LAMPORTS = 10_000_000  # 0.01 SOL
 
+# Seconds between background refreshes of the SOL price and treasury balance
+CHAIN_REFRESH_SECONDS = float(os.getenv("CHAIN_REFRESH_SECONDS", "20"))
+
+# getMultipleAccounts accepts at most 100 pubkeys per request
+MAX_MULTIPLE_ACCOUNTS = 100
+
 # Solana Memo Program ID (for on-chain action logging)
 MEMO_PROGRAM_ID = Pubkey.from_string("MemoSq4gqABAXKb96qnH8TysNcWxMyWCqXgDLGmfcHr")
 
 
+@lru_cache(maxsize=1024)
+def _pk(pubkey_str: str) -> Pubkey:
+    """Memoized Pubkey.from_string (base58 decode); Pubkey is immutable."""
+    return Pubkey.from_string(pubkey_str)
+
+
+def fmt_sol(lamports: int) -> str:
+    """Format lamports as "X.XXXXXX SOL" using integer math (no float rounding)."""
+    micro = (lamports + 500) // 1000  # round to 6 decimals
+    sol, frac = divmod(micro, 1_000_000)
+    return f"{sol}.{frac:06d} SOL"
+
+
+# Entry verifications arriving within this window share one batched RPC request
+VERIFY_BATCH_WINDOW = 0.05
+VERIFY_BATCH_MAX = 256
+
+
+def _check_transfer(treasury_idx: Optional[int], sender_idx: Optional[int],
+                    pre_balances: List[int], post_balances: List[int],
+                    expected_amount: int) -> Tuple[bool, str]:
+    """Check a transaction's treasury balance delta against the expected amount."""
+    if treasury_idx is None:
+        return False, "Treasury not found in transaction accounts"
+    if sender_idx is None:
+        return False, "Sender not found in transaction accounts"
+
+    received = post_balances[treasury_idx] - pre_balances[treasury_idx]
+    if received < expected_amount:
+        return False, (
+            f"Insufficient transfer: {received} lamports, "
+            f"need {expected_amount}"
+        )
+
+    return True, f"Verified: {received} lamports transferred"
+
+
 class PortSolGate:
     """
     Solana-native gate client for Port Sol.
@@ -49,17 +94,27 @@ class PortSolGate:
         self.network = os.getenv('SOLANA_NETWORK', 'devnet')
 
         treasury_str = treasury_pubkey or os.getenv('TREASURY_PUBKEY')
-        self.treasury_pubkey = Pubkey.from_string(treasury_str) if treasury_str else None
+        self.treasury_pubkey = _pk(treasury_str) if treasury_str else None
+        # Canonical base58 form, computed once for API responses
+        self.treasury_str = str(self.treasury_pubkey) if self.treasury_pubkey else None
 
-        self.entry_fee_lamports = int(
+        self.set_entry_fee(int(
             os.getenv('ENTRY_FEE_LAMPORTS', str(DEFAULT_ENTRY_FEE_LAMPORTS))
-        )
+        ))
 
         self.client = SolanaClient(self.rpc_url)
 
-        # In-memory registry of active entries (wallet_pubkey -> entry_info)
-        # Persisted to DB via the world engine
-        self._active_entries: dict[str, dict] = {}
+        # DEBUG_MODE skips the entry check; resolved once instead of per request
+        self._debug_mode = os.getenv("DEBUG_MODE", "").lower() in ("1", "true", "yes")
+
+        # In-memory registry of active entries, persisted to DB via the world engine.
+        # The set serves the hot membership check; metadata lives in a side table.
+        self._active_wallets: set[str] = set()
+        self._entry_meta: dict[str, dict] = {}
+
+        # Pending verify_transfer_batched calls: (tx_signature, from_pubkey, future)
+        self._pending_verifies: List[Tuple[str, str, asyncio.Future]] = []
+        self._verify_flush_task: Optional[asyncio.Task] = None
 
     # ------------------------------------------------------------------
     # Connection helpers
@@ -72,15 +127,49 @@ class PortSolGate:
         except Exception:
             return False
 
+    def _balance_of(self, pubkey: Pubkey) -> int:
+        """SOL balance in lamports for a parsed pubkey (0 on RPC error)."""
+        try:
+            return self.client.get_balance(pubkey, commitment=Confirmed).value
+        except Exception as e:
+            print(f"Error getting balance: {e}")
+            return 0
+
     def get_balance(self, wallet_pubkey: str) -> int:
         """Get SOL balance in lamports."""
         try:
-            pubkey = Pubkey.from_string(wallet_pubkey)
-            resp = self.client.get_balance(pubkey, commitment=Confirmed)
-            return resp.value
-        except Exception as e:
+            pubkey = _pk(wallet_pubkey)
+        except ValueError as e:
             print(f"Error getting balance: {e}")
             return 0
+        return self._balance_of(pubkey)
+
+    def get_balances(self, wallet_pubkeys: List[str]) -> Dict[str, int]:
+        """
+        Get SOL balances (lamports) for many wallets via getMultipleAccounts,
+        one RPC round trip per 100 accounts. Unknown or invalid wallets map to 0.
+        """
+        balances = dict.fromkeys(wallet_pubkeys, 0)
+        pubkeys = []
+        for w in balances:
+            try:
+                pubkeys.append((w, _pk(w)))
+            except ValueError:
+                pass
+
+        for start in range(0, len(pubkeys), MAX_MULTIPLE_ACCOUNTS):
+            chunk = pubkeys[start:start + MAX_MULTIPLE_ACCOUNTS]
+            try:
+                resp = self.client.get_multiple_accounts(
+                    [pk for _, pk in chunk], commitment=Confirmed
+                )
+            except Exception as e:
+                print(f"Error getting balances: {e}")
+                continue
+            for (w, _), account in zip(chunk, resp.value):
+                if account is not None:
+                    balances[w] = account.lamports
+        return balances
 
     def get_balance_sol(self, wallet_pubkey: str) -> float:
         """Get SOL balance as human-readable float."""
@@ -92,23 +181,25 @@ class PortSolGate:
 
     def get_entry_fee_formatted(self) -> str:
         """Get entry fee as human-readable string."""
-        return f"{self.entry_fee_lamports / LAMPORTS_PER_SOL} SOL"
+        return self._fee_fmt
+
+    def set_entry_fee(self, lamports: int):
+        """Set the entry fee and refresh its cached display string."""
+        self.entry_fee_lamports = lamports
+        self._fee_fmt = f"{lamports / LAMPORTS_PER_SOL} SOL"
 
     # ------------------------------------------------------------------
     # Entry management
     # ------------------------------------------------------------------
     def is_active_entry(self, wallet_pubkey: str) -> bool:
-        """Check if wallet has an active entry."""
-        # In DEBUG_MODE, skip check
-        if os.getenv("DEBUG_MODE", "").lower() in ("1", "true", "yes"):
-            return True
-
-        return wallet_pubkey in self._active_entries
+        """Check if wallet has an active entry (always True in DEBUG_MODE)."""
+        return self._debug_mode or wallet_pubkey in self._active_wallets
 
     def register_entry(self, wallet_pubkey: str, tx_signature: str = None):
         """Register an active entry after verifying payment."""
-        import time
-        self._active_entries[wallet_pubkey] = {
+        wallet_pubkey = sys.intern(wallet_pubkey)
+        self._active_wallets.add(wallet_pubkey)
+        self._entry_meta[wallet_pubkey] = {
             "entered_at": int(time.time()),
             "tx_signature": tx_signature,
             "fee_paid": self.entry_fee_lamports,
@@ -116,15 +207,21 @@ class PortSolGate:
 
     def remove_entry(self, wallet_pubkey: str):
         """Remove an active entry (on exit/cashout)."""
-        self._active_entries.pop(wallet_pubkey, None)
+        self._active_wallets.discard(wallet_pubkey)
+        self._entry_meta.pop(wallet_pubkey, None)
+
+    def active_entry_count(self) -> int:
+        """Number of active entries (no copy of the registry)."""
+        return len(self._active_wallets)
 
     def get_active_entries(self) -> dict:
         """Get all active entries (for persistence)."""
-        return dict(self._active_entries)
+        return dict(self._entry_meta)
 
     def load_entries(self, entries: dict):
         """Load entries from persistence (DB)."""
-        self._active_entries = dict(entries)
+        self._entry_meta = dict(entries)
+        self._active_wallets = set(entries)
 
     # ------------------------------------------------------------------
     # Transaction helpers
@@ -158,40 +255,124 @@ class PortSolGate:
 
             # Get account keys from the transaction
             account_keys = resp.value.transaction.transaction.message.account_keys
-            treasury_idx = None
-            sender_idx = None
-
-            for i, key in enumerate(account_keys):
-                if str(key) == str(self.treasury_pubkey):
-                    treasury_idx = i
-                if str(key) == from_pubkey:
-                    sender_idx = i
-
-            if treasury_idx is None:
-                return False, "Treasury not found in transaction accounts"
-            if sender_idx is None:
-                return False, "Sender not found in transaction accounts"
-
-            received = post_balances[treasury_idx] - pre_balances[treasury_idx]
-            if received < expected_amount:
-                return False, (
-                    f"Insufficient transfer: {received} lamports, "
-                    f"need {expected_amount}"
-                )
+            key_index = {key: i for i, key in enumerate(account_keys)}
+            treasury_idx = key_index.get(self.treasury_pubkey)
+            sender_idx = key_index.get(_pk(from_pubkey))
 
-            return True, f"Verified: {received} lamports transferred"
+            return _check_transfer(
+                treasury_idx, sender_idx, pre_balances, post_balances, expected_amount
+            )
 
         except Exception as e:
             return False, f"Verification error: {e}"
 
+    async def verify_transfer_batched(self, tx_signature: str,
+                                      from_pubkey: str) -> Tuple[bool, str]:
+        """
+        Async verify_transfer. Calls arriving within VERIFY_BATCH_WINDOW are
+        collected and checked with one batched getTransaction RPC request.
+        """
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending_verifies.append((tx_signature, from_pubkey, fut))
+        if len(self._pending_verifies) == 1:
+            loop.call_later(VERIFY_BATCH_WINDOW, self._schedule_verify_flush)
+        return await fut
+
+    def _schedule_verify_flush(self):
+        self._verify_flush_task = asyncio.get_running_loop().create_task(
+            self._flush_verifies()
+        )
+
+    async def _flush_verifies(self):
+        """Resolve all pending verify_transfer_batched callers."""
+        pending, self._pending_verifies = self._pending_verifies, []
+        for start in range(0, len(pending), VERIFY_BATCH_MAX):
+            chunk = pending[start:start + VERIFY_BATCH_MAX]
+            try:
+                results = await self.verify_transfers(
+                    [(sig, sender) for sig, sender, _ in chunk]
+                )
+            except Exception as e:
+                # Never leave callers waiting on a malformed RPC reply
+                results = [(False, f"Verification error: {e}")] * len(chunk)
+            for (_, _, fut), result in zip(chunk, results):
+                if not fut.done():
+                    fut.set_result(result)
+
+    async def verify_transfers(self, transfers: List[Tuple[str, str]]) -> List[Tuple[bool, str]]:
+        """
+        Verify many (tx_signature, from_pubkey) entry transfers with a single
+        JSON-RPC batch of getTransaction calls. Same checks as verify_transfer.
+        """
+        if not self.treasury_pubkey:
+            return [(False, "Treasury pubkey not configured")] * len(transfers)
+
+        batch = [
+            {
+                "jsonrpc": "2.0",
+                "id": i,
+                "method": "getTransaction",
+                "params": [sig, {
+                    "commitment": "confirmed",
+                    "encoding": "json",
+                    "maxSupportedTransactionVersion": 0,
+                }],
+            }
+            for i, (sig, _) in enumerate(transfers)
+        ]
+        try:
+            resp = await _get_http_client().post(self.rpc_url, json=batch)
+            resp.raise_for_status()
+            replies = {r.get("id"): r for r in resp.json()}
+        except Exception as e:
+            return [(False, f"Verification error: {e}")] * len(transfers)
+
+        results = []
+        for i, (_, from_pubkey) in enumerate(transfers):
+            try:
+                results.append(self._check_transfer_reply(replies.get(i, {}), from_pubkey))
+            except Exception as e:
+                # A malformed reply only fails its own transfer, not the batch
+                results.append((False, f"Verification error: {e}"))
+        return results
+
+    def _check_transfer_reply(self, reply: dict, from_pubkey: str) -> Tuple[bool, str]:
+        """Check one getTransaction JSON-RPC reply against the expected entry transfer."""
+        if "error" in reply:
+            return False, f"Verification error: {reply['error'].get('message')}"
+        tx = reply.get("result")
+        if tx is None:
+            return False, "Transaction not found"
+
+        meta = tx["meta"]
+        if meta.get("err") is not None:
+            return False, f"Transaction failed: {meta['err']}"
+
+        loaded = meta.get("loadedAddresses") or {}
+        account_keys = (
+            tx["transaction"]["message"]["accountKeys"]
+            + loaded.get("writable", []) + loaded.get("readonly", [])
+        )
+        key_index = {key: i for i, key in enumerate(account_keys)}
+        return _check_transfer(
+            key_index.get(self.treasury_str), key_index.get(from_pubkey),
+            meta["preBalances"], meta["postBalances"], self.entry_fee_lamports,
+        )
+
     def send_sol(self, from_keypair_bytes: bytes, to_pubkey: str,
-                 amount_lamports: int, max_retries: int = 3) -> Tuple[bool, str]:
-        """Send SOL from a keypair to a destination pubkey."""
+                 amount_lamports: int, max_retries: int = 3,
+                 recent_blockhash: str = None) -> Tuple[bool, str]:
+        """
+        Send SOL from a keypair to a destination pubkey.
+        If recent_blockhash is given it is used for the first attempt instead
+        of fetching one; retries always fetch a fresh blockhash.
+        """
         last_error = None
         for attempt in range(max_retries):
             try:
                 sender = Keypair.from_bytes(from_keypair_bytes)
-                receiver = Pubkey.from_string(to_pubkey)
+                receiver = _pk(to_pubkey)
 
                 # Build transfer instruction
                 ix = transfer(TransferParams(
@@ -201,15 +382,18 @@ class PortSolGate:
                 ))
 
                 # Get recent blockhash with Finalized commitment for reliability
-                blockhash_resp = self.client.get_latest_blockhash(commitment=Finalized)
-                recent_blockhash = blockhash_resp.value.blockhash
+                if recent_blockhash and attempt == 0:
+                    blockhash = Hash.from_string(recent_blockhash)
+                else:
+                    blockhash_resp = self.client.get_latest_blockhash(commitment=Finalized)
+                    blockhash = blockhash_resp.value.blockhash
 
                 # Build and sign transaction
                 msg = Message.new_with_blockhash(
-                    [ix], sender.pubkey(), recent_blockhash
+                    [ix], sender.pubkey(), blockhash
                 )
                 tx = Transaction.new_unsigned(msg)
-                tx.sign([sender], recent_blockhash)
+                tx.sign([sender], blockhash)
 
                 # Send with matching preflight commitment
                 resp = self.client.send_transaction(
@@ -228,7 +412,6 @@ class PortSolGate:
             except Exception as e:
                 last_error = str(e)
                 if attempt < max_retries - 1:
-                    import time
                     wait = 2 ** attempt
                     print(f"send_sol attempt {attempt + 1} failed: {last_error}, retrying in {wait}s...")
                     time.sleep(wait)
@@ -279,7 +462,6 @@ class PortSolGate:
             except Exception as e:
                 last_error = str(e)
                 if attempt < max_retries - 1:
-                    import time
                     wait = 2 ** attempt
                     print(f"send_memo attempt {attempt + 1} failed: {last_error}, retrying in {wait}s...")
                     time.sleep(wait)
@@ -308,12 +490,13 @@ class PortSolGate:
         """Get reward pool balance (treasury SOL balance in lamports)."""
         if not self.treasury_pubkey:
             return 0
-        return self.get_balance(str(self.treasury_pubkey))
+        return self._balance_of(self.treasury_pubkey)
 
-    def get_reward_pool_formatted(self) -> str:
-        """Get reward pool as human-readable SOL."""
-        pool = self.get_reward_pool()
-        return f"{pool / LAMPORTS_PER_SOL:.6f} SOL"
+    def get_reward_pool_formatted(self, pool: int = None) -> str:
+        """Get reward pool as human-readable SOL (fetched unless a known balance is passed)."""
+        if pool is None:
+            pool = self.get_reward_pool()
+        return fmt_sol(pool)
 
 
 # ---------------------------------------------------------------------------
@@ -332,33 +515,74 @@ class PythPriceFeed:
     def __init__(self):
         self._cached_price: Optional[float] = None
         self._cache_timestamp: float = 0
-        self._cache_ttl: float = 30.0  # Cache for 30 seconds
+        # Cache for 30 seconds, but never longer than the background refresh
+        # interval, so each refresh fetches a new price
+        self._cache_ttl: float = min(30.0, CHAIN_REFRESH_SECONDS)
+
+        # Keep-alive session so refreshes reuse the TLS connection to Hermes
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+
+        # Only one async refresh in flight; concurrent callers share its result,
+        # whether it succeeds or fails
+        self._inflight: Optional[asyncio.Future] = None
+
+    @property
+    def _price_url(self) -> str:
+        return (
+            f"{self.PYTH_HERMES_URL}/v2/updates/price/latest"
+            f"?ids[]={self.SOL_USD_FEED_ID}"
+        )
+
+    def _is_fresh(self, now: float) -> bool:
+        return bool(self._cached_price) and (now - self._cache_timestamp) < self._cache_ttl
+
+    def _store_price(self, data: dict, now: float) -> Optional[float]:
+        """Parse a Hermes response and update the cache."""
+        if data.get("parsed") and len(data["parsed"]) > 0:
+            price_data = data["parsed"][0]["price"]
+            price = int(price_data["price"]) * (10 ** int(price_data["expo"]))
+            self._cached_price = price
+            self._cache_timestamp = now
+            return price
+        return self._cached_price
 
     def get_sol_usd_price(self) -> Optional[float]:
         """Fetch current SOL/USD price from Pyth Hermes API."""
-        import time
-        import requests
-
         # Return cached if fresh
         now = time.time()
-        if self._cached_price and (now - self._cache_timestamp) < self._cache_ttl:
+        if self._is_fresh(now):
             return self._cached_price
 
         try:
-            url = (
-                f"{self.PYTH_HERMES_URL}/v2/updates/price/latest"
-                f"?ids[]={self.SOL_USD_FEED_ID}"
-            )
-            resp = requests.get(url, timeout=10)
+            resp = self._session.get(self._price_url, timeout=(2, 5))
             resp.raise_for_status()
-            data = resp.json()
+            return self._store_price(resp.json(), now)
+
+        except Exception as e:
+            print(f"Pyth price fetch error: {e}")
+
+        return self._cached_price  # Return stale cache on error
+
+    async def get_sol_usd_price_async(self) -> Optional[float]:
+        """Non-blocking variant of get_sol_usd_price for use inside request handlers."""
+        if self._is_fresh(time.time()):
+            return self._cached_price
+
+        if self._inflight is None:
+            self._inflight = asyncio.ensure_future(self._fetch_price_async())
+            self._inflight.add_done_callback(self._clear_inflight)
+        return await asyncio.shield(self._inflight)
+
+    def _clear_inflight(self, _fut: asyncio.Future):
+        self._inflight = None
 
-            if data.get("parsed") and len(data["parsed"]) > 0:
-                price_data = data["parsed"][0]["price"]
-                price = int(price_data["price"]) * (10 ** int(price_data["expo"]))
-                self._cached_price = price
-                self._cache_timestamp = now
-                return price
+    async def _fetch_price_async(self) -> Optional[float]:
+        now = time.time()
+        try:
+            resp = await _get_http_client().get(self._price_url)
+            resp.raise_for_status()
+            return self._store_price(resp.json(), now)
 
         except Exception as e:
             print(f"Pyth price fetch error: {e}")
@@ -371,6 +595,23 @@ class PythPriceFeed:
 # ---------------------------------------------------------------------------
 _gate_client: Optional[PortSolGate] = None
 _pyth_feed: Optional[PythPriceFeed] = None
+_http: Optional[httpx.AsyncClient] = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Shared async HTTP client for outbound API calls (created on first use)."""
+    global _http
+    if _http is None:
+        _http = httpx.AsyncClient(timeout=5.0)
+    return _http
+
+
+async def close_http_client():
+    """Close the shared async HTTP client (call on app shutdown)."""
+    global _http
+    if _http is not None:
+        await _http.aclose()
+        _http = None
 
 
 def get_gate_client() -> PortSolGate:
@@ -1,11 +1,16 @@
 """World Engine Core: WorldState, Agent, WorldEngine with PostgreSQL persistence"""
 import hashlib
 import json
+import sys
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Dict, List, Optional
+from collections import deque
+from typing import Deque, Dict, List, Optional
 from datetime import datetime, timezone
 
+# Max actions kept in the in-memory ledger
+LEDGER_CAPACITY = 10_000
+
 class Region(str, Enum):
     DOCK = "dock"
     MARKET = "market"
@@ -34,7 +39,7 @@ HARVEST_YIELDS = {
     Region.DOCK: [Resource.FISH],
 }
 
-@dataclass
+@dataclass(slots=True)
 class Agent:
     wallet: str
     name: str
@@ -114,7 +119,8 @@ class WorldEngine:
     def __init__(self, use_database: bool = True):
         self.state = WorldState()
         self.agents: Dict[str, Agent] = {}
-        self.ledger: List[dict] = []
+        # Bounded ring buffer of recent actions (full history lives in the DB)
+        self.ledger: Deque[dict] = deque(maxlen=LEDGER_CAPACITY)
         self._use_database = use_database
         self._db = None
         
@@ -223,6 +229,8 @@ class WorldEngine:
         if wallet in self.agents:
             return self.agents[wallet]
         
+        # Interned key: later lookups with the interned wallet compare by identity
+        wallet = sys.intern(wallet)
         agent = Agent(wallet=wallet, name=name, entered_at=self.state.tick)
         self.agents[wallet] = agent
         
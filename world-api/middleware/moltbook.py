@@ -1,15 +1,20 @@
 """Moltbook Identity Verification Middleware"""
 import os
+import asyncio
 import httpx
-from typing import Optional
+from typing import Dict, Optional
 from fastapi import Request, HTTPException
 from pydantic import BaseModel
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 # Moltbook API configuration
 MOLTBOOK_API_URL = "https://moltbook.com/api/v1"
 MOLTBOOK_APP_KEY = os.getenv("MOLTBOOK_APP_KEY", "")  # Your moltdev_xxx key
 MY_DOMAIN = os.getenv("MOLTBOOK_AUDIENCE", "portsol.world")
 
+# POST routes that read request.state.identity (resolved once by IdentityMiddleware)
+IDENTITY_PATHS = frozenset({"/register", "/action"})
+
 class MoltbookAgent(BaseModel):
     """Verified Moltbook agent profile"""
     id: str
@@ -120,7 +125,7 @@ async def get_agent_identity(request: Request) -> dict:
     # Check for Moltbook identity first
     moltbook_token = request.headers.get("X-Moltbook-Identity")
     if moltbook_token:
-        result = await verify_moltbook_identity(moltbook_token)
+        result = await _verify_shared(moltbook_token)
         if result.valid and result.agent:
             identity["moltbook_agent"] = result.agent
             identity["name"] = result.agent.name
@@ -137,6 +142,37 @@ async def get_agent_identity(request: Request) -> dict:
     
     return identity
 
+# In-flight verifications keyed by token, so overlapping requests carrying
+# the same token share one round-trip to Moltbook
+_inflight: Dict[str, "asyncio.Future[MoltbookVerificationResult]"] = {}
+
+
+async def _verify_shared(identity_token: str) -> MoltbookVerificationResult:
+    """verify_moltbook_identity, coalescing concurrent calls for the same token."""
+    fut = _inflight.get(identity_token)
+    if fut is None:
+        fut = asyncio.ensure_future(verify_moltbook_identity(identity_token))
+        _inflight[identity_token] = fut
+        fut.add_done_callback(lambda _: _inflight.pop(identity_token, None))
+    return await asyncio.shield(fut)
+
+
+class IdentityMiddleware:
+    """
+    Resolve the agent identity once per request for IDENTITY_PATHS and
+    store it in request.state.identity.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http" and scope["method"] == "POST" and scope["path"] in IDENTITY_PATHS:
+            request = Request(scope)
+            request.state.identity = await get_agent_identity(request)
+        await self.app(scope, receive, send)
+
+
 def require_moltbook_auth():
     """
     Dependency that requires Moltbook authentication.
@@ -150,7 +186,7 @@ def require_moltbook_auth():
                 detail="Moltbook identity required. Include X-Moltbook-Identity header."
             )
         
-        result = await verify_moltbook_identity(moltbook_token)
+        result = await _verify_shared(moltbook_token)
         if not result.valid:
             raise HTTPException(
                 status_code=401,
@@ -1,18 +1,78 @@
 """Action routes: /action, /register with Solana gate check + Moltbook support"""
-import re
-from fastapi import APIRouter, HTTPException, Header, Request
-from pydantic import BaseModel
-from typing import Optional, Dict, Any
+import os
+import sys
+import time
+import heapq
+from functools import lru_cache
+from itertools import islice
+from fastapi import APIRouter, Depends, HTTPException, Header, Request, Response
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
+from typing import Optional, Dict, Any, Tuple
+from solders.pubkey import Pubkey
+
+from engine.state import get_world_engine
+from engine.rules import RulesEngine
+from engine.world import Region, Agent
+from engine.blockchain import get_gate_client, get_pyth_feed, LAMPORTS_PER_SOL, fmt_sol
+from routes.responses import ORJSONResponse, dumps_json
 
 router = APIRouter()
 
-# Solana base58 pubkey pattern (32-44 chars of base58 alphabet)
-SOLANA_PUBKEY_RE = re.compile(r'^[1-9A-HJ-NP-Za-km-z]{32,44}$')
+# Solana base58 alphabet; pubkeys are 32-44 chars of it
+BASE58_ALPHABET = b"123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+
+def _looks_like_pubkey(address: str) -> bool:
+    """Cheap shape check: 32-44 chars, all base58 (non-ASCII becomes '?' and fails)."""
+    if not 32 <= len(address) <= 44:
+        return False
+    return not address.encode("ascii", "replace").translate(None, BASE58_ALPHABET)
+
+
+@lru_cache(maxsize=4096)
+def _decode_pubkey_32(address: str) -> Optional[bytes]:
+    """Decode a shape-checked pubkey to its 32 raw bytes (memoized; keys are <= 44 chars)."""
+    try:
+        return bytes(Pubkey.from_string(address))
+    except ValueError:
+        return None
+
+
+def decode_pubkey_32(address: str) -> Optional[bytes]:
+    """Decode a base58 Solana pubkey to its 32 raw bytes, or None if invalid."""
+    # Only bounded, well-formed strings reach the cache, so request input can't
+    # pin arbitrary amounts of memory in it
+    if not _looks_like_pubkey(address):
+        return None
+    return _decode_pubkey_32(address)
 
 
 def is_valid_solana_pubkey(address: str) -> bool:
-    """Validate Solana public key format (base58, 32-44 chars)."""
-    return bool(SOLANA_PUBKEY_RE.match(address))
+    """Validate Solana public key (base58 that decodes to exactly 32 bytes)."""
+    return decode_pubkey_32(address) is not None
+
+
+# Short-lived response cache for polled status endpoints: key -> (expires_at, body).
+# One Solana slot (~400ms) collapses bursty dashboard polling into one build.
+RESPONSE_TTL = 0.4
+# Bodies are stored already serialized, so cache hits skip encoding entirely.
+_response_cache: Dict[str, Tuple[float, bytes]] = {}
+
+
+def _cached_response(key: str) -> Optional[Response]:
+    """Return the cached response for key if it has not expired."""
+    entry = _response_cache.get(key)
+    if entry and entry[0] > time.monotonic():
+        return Response(entry[1], media_type="application/json")
+    return None
+
+
+def _cache_response(key: str, payload: Dict[str, Any]) -> Response:
+    """Serialize payload, store it under key for RESPONSE_TTL seconds and return it."""
+    body = dumps_json(payload)
+    _response_cache[key] = (time.monotonic() + RESPONSE_TTL, body)
+    return Response(body, media_type="application/json")
 
 
 class RegisterRequest(BaseModel):
@@ -28,8 +88,32 @@ class ActionRequest(BaseModel):
     nonce: Optional[str] = None
 
 
-@router.post("/register")
-async def register_agent(req: RegisterRequest, request: Request):
+def json_body(model):
+    """
+    Dependency that validates the raw request body straight from JSON bytes
+    (pydantic-core parses and validates in one pass, no json.loads + dict walk).
+    """
+    async def parse(request: Request):
+        try:
+            return model.model_validate_json(await request.body())
+        except ValidationError as e:
+            # Same error shape as FastAPI's own body validation
+            raise RequestValidationError([
+                {**err, "loc": ("body", *err["loc"])} for err in e.errors(include_url=False)
+            ])
+    return parse
+
+
+def json_body_schema(model) -> dict:
+    """openapi_extra documenting a json_body() request model."""
+    return {"requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": model.model_json_schema()}},
+    }}
+
+
+@router.post("/register", openapi_extra=json_body_schema(RegisterRequest))
+async def register_agent(request: Request, req: RegisterRequest = Depends(json_body(RegisterRequest))):
     """
     Register agent (requires SOL payment to treasury first)
 
@@ -37,15 +121,11 @@ async def register_agent(req: RegisterRequest, request: Request):
     - Moltbook Identity (X-Moltbook-Identity header)
     - Direct wallet (X-Wallet header)
     """
-    from engine.state import get_world_engine
-    from engine.blockchain import get_gate_client
-    from middleware.moltbook import get_agent_identity
-
     world = get_world_engine()
     gate = get_gate_client()
 
-    # Get agent identity (Moltbook or wallet)
-    identity = await get_agent_identity(request)
+    # Agent identity (Moltbook or wallet), resolved by IdentityMiddleware
+    identity = request.state.identity
 
     # Use wallet from request body
     wallet = req.wallet
@@ -56,30 +136,35 @@ async def register_agent(req: RegisterRequest, request: Request):
             "success": False,
             "message": f"Invalid Solana wallet address: {wallet}. Must be base58 encoded pubkey.",
         }
+    wallet = sys.intern(wallet)
+
+    active = gate.is_active_entry(wallet)
 
     # If tx_hash provided, verify the on-chain transfer and register entry
-    if req.tx_hash and not gate.is_active_entry(wallet):
-        ok, msg = gate.verify_transfer(req.tx_hash, wallet)
+    if req.tx_hash and not active:
+        ok, msg = await gate.verify_transfer_batched(req.tx_hash, wallet)
         if ok:
             gate.register_entry(wallet, req.tx_hash)
+            active = True
         else:
             return {
                 "success": False,
                 "message": f"Transfer verification failed: {msg}",
-                "treasury": str(gate.treasury_pubkey) if gate.treasury_pubkey else None,
+                "treasury": gate.treasury_str,
                 "entry_fee": gate.get_entry_fee_formatted(),
             }
 
-    # Check entry status
-    if not gate.is_active_entry(wallet):
+    # Check entry status (the single lookup above, updated on verification)
+    if not active:
+        entry_fee = gate.get_entry_fee_formatted()
         return {
             "success": False,
             "message": (
                 f"Wallet {wallet} has not entered the world. "
-                f"Send {gate.get_entry_fee_formatted()} to treasury first."
+                f"Send {entry_fee} to treasury first."
             ),
-            "treasury": str(gate.treasury_pubkey) if gate.treasury_pubkey else None,
-            "entry_fee": gate.get_entry_fee_formatted(),
+            "treasury": gate.treasury_str,
+            "entry_fee": entry_fee,
             "entry_fee_lamports": gate.get_entry_fee(),
             "network": gate.network,
             "auth_hint": "Read /moltbook/auth-info for Moltbook auth"
@@ -110,10 +195,10 @@ async def register_agent(req: RegisterRequest, request: Request):
     return response
 
 
-@router.post("/action")
+@router.post("/action", openapi_extra=json_body_schema(ActionRequest))
 async def submit_action(
-    req: ActionRequest,
     request: Request,
+    req: ActionRequest = Depends(json_body(ActionRequest)),
     x_wallet: Optional[str] = Header(None),
     x_moltbook_identity: Optional[str] = Header(None)
 ):
@@ -124,18 +209,13 @@ async def submit_action(
     - Moltbook Identity (X-Moltbook-Identity header)
     - Direct wallet (X-Wallet header)
     """
-    from engine.state import get_world_engine
-    from engine.rules import RulesEngine
-    from engine.blockchain import get_gate_client
-    from middleware.moltbook import get_agent_identity
-
     world = get_world_engine()
     gate = get_gate_client()
 
-    # Get agent identity
-    identity = await get_agent_identity(request)
+    # Agent identity, resolved by IdentityMiddleware
+    identity = request.state.identity
 
-    wallet = x_wallet or req.actor
+    wallet = sys.intern(x_wallet or req.actor)
 
     # Check entry status
     if not gate.is_active_entry(wallet):
@@ -164,25 +244,29 @@ async def submit_action(
     return result
 
 
-@router.post("/debug/advance_tick")
+@router.post("/debug/advance_tick", response_class=ORJSONResponse, response_model=None)
 async def advance_tick():
     """Debug: manually advance one tick"""
-    from engine.state import get_world_engine
     world = get_world_engine()
-    return world.process_tick()
+    return ORJSONResponse(world.process_tick())
 
 
-@router.post("/debug/reset_agent/{wallet}")
+@router.post("/debug/advance_ticks", response_class=ORJSONResponse, response_model=None)
+async def advance_ticks(n: int = 1):
+    """Debug: manually advance n ticks in one request"""
+    world = get_world_engine()
+    ticks = [world.process_tick() for _ in range(max(0, min(n, 100)))]
+    return ORJSONResponse({"count": len(ticks), "ticks": ticks})
+
+
+@router.post("/debug/reset_agent/{wallet}", response_class=ORJSONResponse, response_model=None)
 async def reset_agent(wallet: str, credits: int = 1000):
     """Debug: reset agent to initial state"""
-    from engine.state import get_world_engine
-    from engine.world import Region
-
     world = get_world_engine()
     agent = world.get_agent(wallet)
 
     if not agent:
-        return {"success": False, "error": "Agent not found"}
+        return ORJSONResponse({"success": False, "error": "Agent not found"})
 
     agent.credits = credits
     agent.energy = 100
@@ -191,97 +275,89 @@ async def reset_agent(wallet: str, credits: int = 1000):
     agent.region = Region.DOCK
     agent.reputation = 100
 
+    # One snapshot serves both the DB save and the response
+    agent_data = agent.to_dict()
     if world._db:
-        world._db.save_agent(agent.to_dict())
+        world._db.save_agent(agent_data)
 
-    return {
+    return ORJSONResponse({
         "success": True,
         "message": f"Agent {agent.name} reset to initial state",
-        "agent": agent.to_dict()
-    }
+        "agent": agent_data
+    })
 
 
-@router.post("/debug/reset_world")
+@router.post("/debug/reset_world", response_class=ORJSONResponse, response_model=None)
 async def reset_world():
     """Debug: FULL world reset - tick, prices, events, ledger"""
-    from engine.state import get_world_engine
-
     world = get_world_engine()
     world.state.tick = 0
     world.state.market_prices = {"iron": 15, "wood": 12, "fish": 8}
     world.state.active_events = []
     world.state.state_hash = ""
-    world.ledger = []
+    world.ledger.clear()
     world._compute_state_hash()
     world._save_to_database()
 
-    return {
+    return ORJSONResponse({
         "success": True,
         "message": "World fully reset: tick=0, prices=default, events cleared",
         "tick": world.state.tick,
         "market_prices": world.state.market_prices
-    }
+    })
 
 
-@router.post("/debug/reset_all_credits")
+@router.post("/debug/reset_all_credits", response_class=ORJSONResponse, response_model=None)
 async def reset_all_credits(credits: int = 1000):
     """Debug: reset ALL agents' credits, energy, inventory, reputation"""
-    from engine.state import get_world_engine
-    from engine.world import Region
-
     world = get_world_engine()
 
-    results = []
-    for wallet, agent in world.agents.items():
-        old_credits = agent.credits
+    results = [
+        {
+            "name": agent.name,
+            "wallet": f"{wallet[:12]}...",
+            "old_credits": agent.credits,
+            "new_credits": credits
+        }
+        for wallet, agent in world.agents.items()
+    ]
+    for agent in world.agents.values():
         agent.credits = credits
         agent.energy = 100
         agent.max_energy = 100
         agent.reputation = 100
-        agent.inventory = {}
+        agent.inventory.clear()
         agent.region = Region.DOCK
-        results.append({
-            "name": agent.name,
-            "wallet": wallet[:12] + "...",
-            "old_credits": old_credits,
-            "new_credits": credits
-        })
 
     world._save_to_database()
 
-    return {
+    return ORJSONResponse({
         "success": True,
         "message": f"Reset {len(results)} agents to {credits} credits",
         "agents": results
-    }
+    })
 
 
-@router.delete("/debug/delete_agent/{wallet}")
+@router.delete("/debug/delete_agent/{wallet}", response_class=ORJSONResponse, response_model=None)
 async def delete_agent(wallet: str):
     """Debug: delete an agent from the world"""
-    from engine.state import get_world_engine
-
     world = get_world_engine()
 
     if wallet not in world.agents:
-        return {"success": False, "error": f"Agent {wallet} not found"}
+        return ORJSONResponse({"success": False, "error": f"Agent {wallet} not found"})
 
     agent_name = world.agents[wallet].name
     del world.agents[wallet]
 
-    return {
+    return ORJSONResponse({
         "success": True,
         "message": f"Agent {agent_name} ({wallet}) deleted"
-    }
+    })
 
 
-@router.post("/debug/full_reset")
+@router.post("/debug/full_reset", response_class=ORJSONResponse, response_model=None)
 async def full_reset():
     """Debug: NUCLEAR RESET - clear everything and start fresh"""
-    from engine.state import get_world_engine
-    from engine.world import Region, Agent
-    import os
-
     world = get_world_engine()
 
     # Reset world state
@@ -289,7 +365,7 @@ async def full_reset():
     world.state.market_prices = {"iron": 15, "wood": 12, "fish": 8}
     world.state.active_events = []
     world.state.state_hash = ""
-    world.ledger = []
+    world.ledger.clear()
 
     # Keep bot wallets from env if available
     bot_wallets = {}
@@ -313,30 +389,28 @@ async def full_reset():
         try:
             with world._db.cursor() as cur:
                 if cur:
-                    cur.execute("DELETE FROM agents")
-                    cur.execute("DELETE FROM world_state")
-                    cur.execute("DELETE FROM action_ledger")
-                    cur.execute("DELETE FROM events")
+                    # One statement (atomic under autocommit) instead of four DELETEs
+                    cur.execute(
+                        "TRUNCATE agents, world_state, action_ledger, events RESTART IDENTITY"
+                    )
         except Exception as e:
             print(f"DB cleanup error: {e}")
 
     world._compute_state_hash()
     world._save_to_database()
 
-    return {
+    return ORJSONResponse({
         "success": True,
         "message": f"FULL RESET: {len(bot_wallets)} agents, tick=0, DB cleaned",
         "tick": 0,
         "agents": [a.to_dict() for a in world.agents.values()],
         "market_prices": world.state.market_prices
-    }
+    })
 
 
 @router.get("/gate/status/{wallet}")
 async def gate_status(wallet: str):
     """Check wallet's entry status and SOL balance"""
-    from engine.blockchain import get_gate_client, LAMPORTS_PER_SOL
-
     gate = get_gate_client()
 
     is_active = gate.is_active_entry(wallet)
@@ -345,12 +419,12 @@ async def gate_status(wallet: str):
     return {
         "wallet": wallet,
         "is_active_entry": is_active,
-        "sol_balance": f"{balance / LAMPORTS_PER_SOL:.6f} SOL",
+        "sol_balance": fmt_sol(balance),
         "sol_lamports": balance,
         "entry_fee": gate.get_entry_fee_formatted(),
         "entry_fee_lamports": gate.get_entry_fee(),
         "can_enter": balance >= gate.get_entry_fee() and not is_active,
-        "treasury": str(gate.treasury_pubkey) if gate.treasury_pubkey else None,
+        "treasury": gate.treasury_str,
         "network": gate.network,
     }
 
@@ -358,7 +432,6 @@ async def gate_status(wallet: str):
 @router.get("/moltbook/auth-info")
 async def moltbook_auth_info():
     """Get Moltbook authentication instructions"""
-    import os
     return {
         "auth_url": f"https://moltbook.com/auth.md?app=PortSol&endpoint={os.getenv('API_URL', 'http://localhost:8000')}/action",
         "header": "X-Moltbook-Identity",
@@ -368,45 +441,58 @@ async def moltbook_auth_info():
     }
 
 
-@router.get("/agents")
-async def list_agents():
-    """Get list of all registered agents and their states (leaderboard)."""
-    from engine.state import get_world_engine
+def _by_credits(item: Tuple[str, Agent]) -> int:
+    return item[1].credits
+
+
+@router.get("/agents", response_class=ORJSONResponse, response_model=None)
+async def list_agents(limit: Optional[int] = None, offset: int = 0):
+    """
+    Get registered agents and their states, richest first (leaderboard).
+    Optional limit/offset page the list; count is always the total.
+    """
     world = get_world_engine()
 
-    agents = []
-    for wallet, agent in world.agents.items():
-        agents.append({
+    # Rank agent objects, then build response dicts only for the requested page.
+    # With a limit only the top offset+limit are needed: O(N log K) via a heap
+    offset = max(offset, 0)
+    if limit is None:
+        ranked = sorted(world.agents.items(), key=_by_credits, reverse=True)
+        end = None
+    else:
+        end = offset + max(limit, 0)
+        ranked = heapq.nlargest(end, world.agents.items(), key=_by_credits)
+
+    agents = [
+        {
             "wallet": wallet,
             "name": agent.name,
             "region": agent.region.value if hasattr(agent.region, 'value') else str(agent.region),
             "credits": agent.credits,
             "energy": agent.energy,
-            "inventory": dict(agent.inventory),
+            "inventory": agent.inventory,
             "reputation": agent.reputation
-        })
-
-    agents.sort(key=lambda x: x["credits"], reverse=True)
+        }
+        for wallet, agent in ranked[offset:end]
+    ]
 
-    return {
-        "count": len(agents),
+    # Returning the response directly skips FastAPI's jsonable_encoder pass
+    return ORJSONResponse({
+        "count": len(world.agents),
         "agents": agents
-    }
+    })
 
 
-@router.get("/actions/recent")
+@router.get("/actions/recent", response_class=ORJSONResponse, response_model=None)
 async def recent_actions(limit: int = 20):
     """Get recent actions across all agents (for dashboard)"""
-    from engine.state import get_world_engine
-
     world = get_world_engine()
-    actions = world.ledger[-limit:] if world.ledger else []
-    actions = list(reversed(actions))
+    actions = list(islice(reversed(world.ledger), max(limit, 0)))
 
-    return {
+    return ORJSONResponse({
         "count": len(actions),
         "actions": actions
-    }
+    })
 
 
 @router.get("/cashout/estimate/{credits}")
@@ -415,8 +501,6 @@ async def cashout_estimate(credits: int):
     Estimate SOL amount for cashing out credits.
     Rate: 1 credit = 1 lamport.
     """
-    from engine.blockchain import LAMPORTS_PER_SOL
-
     lamports = credits
     sol_amount = lamports / LAMPORTS_PER_SOL
 
@@ -428,41 +512,50 @@ async def cashout_estimate(credits: int):
     }
 
 
-@router.get("/contract/stats")
-async def contract_stats():
+@router.get("/contract/stats", response_class=ORJSONResponse, response_model=None)
+async def contract_stats(request: Request):
     """Get Port Sol treasury statistics."""
-    from engine.blockchain import get_gate_client, get_pyth_feed
+    cached = _cached_response("contract_stats")
+    if cached is not None:
+        return cached
 
+    # Chain data comes only from the background refresher; never fetched inline
     gate = get_gate_client()
-    pyth = get_pyth_feed()
+    state = request.app.state
 
     stats = {
-        "treasury": str(gate.treasury_pubkey) if gate.treasury_pubkey else None,
+        "treasury": gate.treasury_str,
         "network": gate.network,
         "entry_fee": gate.get_entry_fee_formatted(),
-        "reward_pool": gate.get_reward_pool_formatted(),
-        "active_entries": len(gate.get_active_entries()),
+        "reward_pool": (
+            gate.get_reward_pool_formatted(state.cached_pool)
+            if state.cached_pool is not None else None
+        ),
+        "active_entries": gate.active_entry_count(),
     }
 
-    sol_price = pyth.get_sol_usd_price()
+    sol_price = state.cached_sol_usd
     if sol_price:
         stats["sol_usd_price"] = sol_price
         stats["price_source"] = "Pyth Network"
 
-    return stats
+    return _cache_response("contract_stats", stats)
 
 
-@router.get("/pyth/price")
-async def pyth_price():
+@router.get("/pyth/price", response_class=ORJSONResponse, response_model=None)
+async def pyth_price(request: Request):
     """Get real-time SOL/USD price from Pyth Network."""
-    from engine.blockchain import get_pyth_feed
+    cached = _cached_response("pyth_price")
+    if cached is not None:
+        return cached
 
+    # Last price from the background refresher (None until the first success)
     pyth = get_pyth_feed()
-    price = pyth.get_sol_usd_price()
+    price = request.app.state.cached_sol_usd
 
-    return {
+    return _cache_response("pyth_price", {
         "feed": "SOL/USD",
         "price": price,
         "source": "Pyth Network (Hermes)",
         "feed_id": pyth.SOL_USD_FEED_ID,
-    }
+    })
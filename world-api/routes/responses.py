@@ -0,0 +1,32 @@
+"""Shared response classes"""
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+# Try to import orjson, fall back to the stdlib encoder if not available
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+if ORJSON_AVAILABLE:
+    def dumps_json(content: Any) -> bytes:
+        """Serialize content to JSON bytes with orjson"""
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+    class ORJSONResponse(JSONResponse):
+        """JSON response serialized with orjson (C encoder)"""
+
+        def render(self, content: Any) -> bytes:
+            return dumps_json(content)
+else:
+    def dumps_json(content: Any) -> bytes:
+        """Serialize content to JSON bytes with the stdlib encoder (as JSONResponse does)"""
+        return json.dumps(
+            content, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+        ).encode("utf-8")
+
+    ORJSONResponse = JSONResponse
@@ -0,0 +1,182 @@
+"""App tests: cached static pages, zero-copy send, gzip negotiation and /world/meta"""
+import asyncio
+import os
+
+import pytest
+from starlette.requests import Request
+
+import app as app_module
+
+
+def make_request(headers=None, extensions=None):
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/dashboard",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+        "extensions": extensions or {},
+    }
+    return Request(scope)
+
+
+def run_response(response, request):
+    """Run an ASGI response against a fake send and return the sent messages"""
+    sent = []
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(response(request.scope, receive, send))
+    return sent
+
+
+@pytest.fixture
+def dashboard():
+    entry = app_module._STATIC_CACHE.get("dashboard")
+    if entry is None:
+        pytest.skip("static/index.html not present")
+    return entry, app_module.app.state.static_files["dashboard"]
+
+
+class TestZeroCopySend:
+    """ZeroCopyResponse emits http.response.zerocopysend only when the server offers it"""
+
+    def test_zerocopysend_with_file_object(self, dashboard):
+        entry, file = dashboard
+        request = make_request(extensions={"http.response.zerocopysend": {}})
+        sent = run_response(app_module._packed_response(request, entry, "no-cache", file), request)
+
+        assert [m["type"] for m in sent] == ["http.response.start", "http.response.zerocopysend"]
+        message = sent[1]
+        assert message["file"] is file.file
+        assert os.fstat(message["file"].fileno()).st_size == len(entry[0])
+        assert (message["offset"], message["count"], message["more_body"]) == (0, len(entry[0]), False)
+
+    def test_fallback_sends_cached_bytes(self, dashboard):
+        entry, file = dashboard
+        request = make_request()
+        sent = run_response(app_module._packed_response(request, entry, "no-cache", file), request)
+
+        assert [m["type"] for m in sent] == ["http.response.start", "http.response.body"]
+        assert sent[1]["body"] == entry[0]
+
+    def test_gzip_client_gets_precompressed_body(self, dashboard):
+        entry, file = dashboard
+        request = make_request(
+            headers={"Accept-Encoding": "gzip"},
+            extensions={"http.response.zerocopysend": {}},
+        )
+        sent = run_response(app_module._packed_response(request, entry, "no-cache", file), request)
+
+        assert sent[1]["type"] == "http.response.body"
+        assert sent[1]["body"] == entry[3]
+
+
+    def test_edited_file_falls_back_to_cached_bytes(self, tmp_path):
+        path = tmp_path / "page.html"
+        path.write_bytes(b"<html>v1</html>")
+        static = app_module.StaticFile.open(path)
+        entry = app_module._pack_body(path.read_bytes(), "text/html")
+        request = make_request(extensions={"http.response.zerocopysend": {}})
+        try:
+            sent = run_response(app_module._packed_response(request, entry, "no-cache", static), request)
+            assert sent[1]["type"] == "http.response.zerocopysend"
+
+            # Edited in place: the open handle now sees different bytes
+            with open(path, "ab") as f:
+                f.write(b"<!-- v2 -->")
+            sent = run_response(app_module._packed_response(request, entry, "no-cache", static), request)
+            assert sent[1]["type"] == "http.response.body"
+            assert sent[1]["body"] == b"<html>v1</html>"
+        finally:
+            static.file.close()
+
+
+class TestWorldMeta:
+    """/world/meta tracks runtime entry fee changes"""
+
+    def test_fee_change_rebuilds_body(self):
+        from fastapi.testclient import TestClient
+        from engine.blockchain import get_gate_client
+
+        client = TestClient(app_module.app)
+        gate = get_gate_client()
+        original = gate.get_entry_fee()
+        try:
+            assert client.get("/world/meta").json()["entry_fee_lamports"] == original
+            gate.set_entry_fee(original + 5_000_000)
+            meta = client.get("/world/meta").json()
+            assert meta["entry_fee_lamports"] == original + 5_000_000
+            assert meta["entry_fee"] == gate.get_entry_fee_formatted()
+        finally:
+            gate.set_entry_fee(original)
+
+
+class TestAcceptEncoding:
+    """Precompressed bodies honour Accept-Encoding q-values"""
+
+    @pytest.mark.parametrize("header, expected", [
+        ("gzip", True),
+        ("gzip, deflate, br", True),
+        ("br;q=1.0, gzip;q=0.8", True),
+        ("*", True),
+        ("gzip;q=0", False),
+        ("gzip; q=0.000, *", False),
+        ("*;q=0", False),
+        ("identity", False),
+        ("", False),
+    ])
+    def test_accepts_gzip(self, header, expected):
+        assert app_module._accepts_gzip(header) is expected
+
+    def test_q_zero_gets_identity_body(self, dashboard):
+        entry, file = dashboard
+        request = make_request(headers={"Accept-Encoding": "gzip;q=0"})
+        sent = run_response(app_module._packed_response(request, entry, "no-cache", file), request)
+
+        headers = dict(sent[0]["headers"])
+        assert b"content-encoding" not in headers
+        assert sent[1]["body"] == entry[0]
+
+    def test_json_routes_not_compressed(self):
+        from fastapi.testclient import TestClient
+
+        resp = TestClient(app_module.app).get("/world/state", headers={"Accept-Encoding": "gzip"})
+        assert resp.status_code == 200
+        assert "content-encoding" not in resp.headers
+
+
+class TestLifespan:
+    """Shutdown waits for the chain refresher before closing HTTP clients"""
+
+    def test_refresher_finishes_before_client_close(self, monkeypatch):
+        from fastapi.testclient import TestClient
+
+        events = []
+
+        async def fake_refresher(app):
+            events.append("started")
+            try:
+                await asyncio.sleep(3600)
+            except asyncio.CancelledError:
+                await asyncio.sleep(0)  # still unwinding (e.g. mid-RPC)
+                events.append("cancelled")
+                raise
+
+        async def fake_close():
+            events.append("closed")
+
+        monkeypatch.setattr(app_module, "_refresh_chain_data", fake_refresher)
+        monkeypatch.setattr(app_module, "close_http_client", fake_close)
+        with TestClient(app_module.app):
+            pass
+
+        assert events == ["started", "cancelled", "closed"]
+
+    def test_price_ttl_within_refresh_interval(self):
+        from engine.blockchain import PythPriceFeed, CHAIN_REFRESH_SECONDS
+
+        assert PythPriceFeed()._cache_ttl <= CHAIN_REFRESH_SECONDS
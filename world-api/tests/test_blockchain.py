@@ -0,0 +1,250 @@
+"""Blockchain tests: batched RPC helpers and Pyth price refresh (canned replies)"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from engine import blockchain
+from engine.blockchain import PortSolGate, DEFAULT_ENTRY_FEE_LAMPORTS, MAX_MULTIPLE_ACCOUNTS
+from solders.pubkey import Pubkey
+
+TREASURY = "So11111111111111111111111111111111111111112"
+SENDER = "11111111111111111111111111111111"
+OTHER = "SysvarRent111111111111111111111111111111111"
+
+
+def tx_reply(sender=SENDER, received=DEFAULT_ENTRY_FEE_LAMPORTS, err=None):
+    """getTransaction result moving `received` lamports from sender to treasury"""
+    return {
+        "meta": {
+            "err": err,
+            "preBalances": [10**9, 0],
+            "postBalances": [10**9 - received, received],
+            "loadedAddresses": {"writable": [], "readonly": []},
+        },
+        "transaction": {"message": {"accountKeys": [sender, TREASURY]}},
+    }
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+class FakeClient:
+    """Answers each batch with results[signature] for every request in it"""
+
+    def __init__(self, results):
+        self.results = results
+        self.calls = 0
+
+    async def post(self, url, json):
+        self.calls += 1
+        return FakeResponse([
+            {"jsonrpc": "2.0", "id": req["id"], **self.results[req["params"][0]]}
+            for req in json
+        ])
+
+
+@pytest.fixture
+def gate():
+    return PortSolGate(rpc_url="http://rpc.invalid", treasury_pubkey=TREASURY)
+
+
+def use_replies(monkeypatch, results):
+    client = FakeClient(results)
+    monkeypatch.setattr(blockchain, "_get_http_client", lambda: client)
+    return client
+
+
+class TestVerifyTransfers:
+    """verify_transfers: one JSON-RPC batch, per-transfer results"""
+
+    def test_valid_transfer(self, gate, monkeypatch):
+        use_replies(monkeypatch, {"sig": {"result": tx_reply()}})
+        [(ok, msg)] = asyncio.run(gate.verify_transfers([("sig", SENDER)]))
+        assert ok, msg
+
+    def test_mixed_results(self, gate, monkeypatch):
+        client = use_replies(monkeypatch, {
+            "good": {"result": tx_reply()},
+            "missing": {"result": None},
+            "short": {"result": tx_reply(received=1)},
+            "failed": {"result": tx_reply(err={"InstructionError": [0, "x"]})},
+            "rpc_error": {"error": {"code": -32602, "message": "bad sig"}},
+        })
+        results = asyncio.run(gate.verify_transfers([
+            ("good", SENDER), ("missing", SENDER), ("short", SENDER),
+            ("failed", SENDER), ("rpc_error", SENDER), ("good", OTHER),
+        ]))
+        assert client.calls == 1
+        assert results[0][0]
+        assert results[1] == (False, "Transaction not found")
+        assert "Insufficient transfer" in results[2][1]
+        assert "Transaction failed" in results[3][1]
+        assert results[4] == (False, "Verification error: bad sig")
+        assert results[5] == (False, "Sender not found in transaction accounts")
+
+    def test_malformed_reply_fails_only_its_transfer(self, gate, monkeypatch):
+        broken = tx_reply()
+        broken["meta"] = None
+        use_replies(monkeypatch, {"good": {"result": tx_reply()}, "broken": {"result": broken}})
+        results = asyncio.run(gate.verify_transfers([("good", SENDER), ("broken", SENDER)]))
+        assert results[0][0]
+        assert not results[1][0]
+        assert results[1][1].startswith("Verification error")
+
+    def test_batched_callers_isolated(self, gate, monkeypatch):
+        broken = tx_reply()
+        del broken["meta"]["preBalances"]
+        client = use_replies(monkeypatch, {
+            "a": {"result": tx_reply()}, "b": {"result": tx_reply()}, "bad": {"result": broken},
+        })
+
+        async def register_three():
+            return await asyncio.gather(
+                gate.verify_transfer_batched("a", SENDER),
+                gate.verify_transfer_batched("bad", SENDER),
+                gate.verify_transfer_batched("b", SENDER),
+            )
+
+        results = asyncio.run(register_three())
+        assert client.calls == 1
+        assert [ok for ok, _ in results] == [True, False, True]
+
+
+class TestPythPriceFeed:
+    """Async price refresh is single-flight, including on failure"""
+
+    def test_concurrent_callers_share_one_fetch(self, monkeypatch):
+        calls = []
+
+        class FailingClient:
+            async def get(self, url):
+                calls.append(url)
+                await asyncio.sleep(0.01)
+                raise RuntimeError("upstream down")
+
+        monkeypatch.setattr(blockchain, "_get_http_client", lambda: FailingClient())
+        feed = blockchain.PythPriceFeed()
+
+        async def six_callers():
+            return await asyncio.gather(*[feed.get_sol_usd_price_async() for _ in range(6)])
+
+        assert asyncio.run(six_callers()) == [None] * 6
+        assert len(calls) == 1
+
+    def test_success_shared_and_cached(self, monkeypatch):
+        calls = []
+        hermes = {"parsed": [{"price": {"price": "15012345678", "expo": -8}}]}
+
+        class HermesClient:
+            async def get(self, url):
+                calls.append(url)
+                await asyncio.sleep(0.01)
+                return FakeResponse(hermes)
+
+        monkeypatch.setattr(blockchain, "_get_http_client", lambda: HermesClient())
+        feed = blockchain.PythPriceFeed()
+
+        async def callers():
+            first = await asyncio.gather(*[feed.get_sol_usd_price_async() for _ in range(4)])
+            return first + [await feed.get_sol_usd_price_async()]
+
+        prices = asyncio.run(callers())
+        assert prices == [pytest.approx(150.12345678)] * 5
+        assert len(calls) == 1
+
+
+class TestEntryRegistry:
+    """Active entry bookkeeping"""
+
+    def test_active_entry_count(self, gate):
+        assert gate.active_entry_count() == 0
+        gate.register_entry(SENDER, "sig1")
+        gate.register_entry(OTHER, "sig2")
+        gate.register_entry(SENDER, "sig3")
+        assert gate.active_entry_count() == 2
+        gate.remove_entry(OTHER)
+        assert gate.active_entry_count() == 1
+        assert gate.active_entry_count() == len(gate.get_active_entries())
+
+
+class FakeSolanaClient:
+    """get_multiple_accounts answering from a {pubkey: lamports or None} table"""
+
+    def __init__(self, lamports):
+        self.lamports = lamports
+        self.chunk_sizes = []
+
+    def get_multiple_accounts(self, pubkeys, commitment=None):
+        self.chunk_sizes.append(len(pubkeys))
+        return SimpleNamespace(value=[
+            None if self.lamports.get(str(pk)) is None
+            else SimpleNamespace(lamports=self.lamports[str(pk)])
+            for pk in pubkeys
+        ])
+
+
+class TestGetBalances:
+    """get_balances: getMultipleAccounts in chunks of MAX_MULTIPLE_ACCOUNTS"""
+
+    def test_chunking_and_missing_accounts(self, gate):
+        wallets = [str(Pubkey.new_unique()) for _ in range(2 * MAX_MULTIPLE_ACCOUNTS + 50)]
+        # Every third account does not exist on chain (value: null)
+        table = {w: None if i % 3 == 0 else 1_000 + i for i, w in enumerate(wallets)}
+        gate.client = FakeSolanaClient(table)
+
+        balances = gate.get_balances(wallets + ["not-a-pubkey"])
+
+        assert gate.client.chunk_sizes == [MAX_MULTIPLE_ACCOUNTS, MAX_MULTIPLE_ACCOUNTS, 50]
+        assert balances["not-a-pubkey"] == 0
+        for i, w in enumerate(wallets):
+            assert balances[w] == (0 if i % 3 == 0 else 1_000 + i)
+
+    def test_failed_chunk_reads_zero(self, gate):
+        wallets = [str(Pubkey.new_unique()) for _ in range(MAX_MULTIPLE_ACCOUNTS + 1)]
+
+        class FlakyClient(FakeSolanaClient):
+            def get_multiple_accounts(self, pubkeys, commitment=None):
+                if not self.chunk_sizes:
+                    self.chunk_sizes.append(len(pubkeys))
+                    raise ConnectionError("rpc down")
+                return super().get_multiple_accounts(pubkeys, commitment)
+
+        gate.client = FlakyClient({w: 5 for w in wallets})
+        balances = gate.get_balances(wallets)
+
+        assert [balances[w] for w in wallets] == [0] * MAX_MULTIPLE_ACCOUNTS + [5]
+
+
+class TestSingleBalances:
+    """get_balance / get_reward_pool share _balance_of (0 on any error)"""
+
+    def test_balance_and_reward_pool(self, gate):
+        seen = []
+
+        class BalanceClient:
+            def get_balance(self, pubkey, commitment=None):
+                seen.append(str(pubkey))
+                return SimpleNamespace(value=42)
+
+        gate.client = BalanceClient()
+        assert gate.get_balance(SENDER) == 42
+        assert gate.get_reward_pool() == 42
+        assert seen == [SENDER, TREASURY]
+
+    def test_errors_read_zero(self, gate):
+        class DownClient:
+            def get_balance(self, pubkey, commitment=None):
+                raise ConnectionError("rpc down")
+
+        gate.client = DownClient()
+        assert gate.get_balance(SENDER) == 0
+        assert gate.get_balance("not-a-pubkey") == 0
+        assert gate.get_reward_pool() == 0
@@ -0,0 +1,137 @@
+"""Route tests: leaderboard paging, debug tick clamping, pubkey validation, request bodies"""
+import pytest
+from fastapi.testclient import TestClient
+
+import app as app_module
+from engine import state
+from engine.world import WorldEngine
+from engine.blockchain import fmt_sol
+from routes import action
+from routes.action import is_valid_solana_pubkey
+
+WALLET = "So11111111111111111111111111111111111111112"
+
+
+@pytest.fixture
+def world(monkeypatch):
+    """Isolated in-memory world behind the API"""
+    engine = WorldEngine(use_database=False)
+    monkeypatch.setattr(state, "_world_engine", engine)
+    return engine
+
+
+@pytest.fixture
+def client(world):
+    return TestClient(app_module.app)
+
+
+class TestAgentsLeaderboard:
+    """/agents: richest first, limit/offset paging, count is the total"""
+
+    @pytest.fixture
+    def ranked(self, world):
+        credits = {"w1": 300, "w2": 900, "w3": 100, "w4": 700, "w5": 500}
+        for wallet, amount in credits.items():
+            world.register_agent(wallet, f"Bot-{wallet}").credits = amount
+        return ["w2", "w4", "w5", "w1", "w3"]
+
+    def test_full_list(self, client, ranked):
+        data = client.get("/agents").json()
+        assert data["count"] == 5
+        assert [a["wallet"] for a in data["agents"]] == ranked
+
+    def test_limit(self, client, ranked):
+        data = client.get("/agents", params={"limit": 2}).json()
+        assert data["count"] == 5
+        assert [a["wallet"] for a in data["agents"]] == ranked[:2]
+
+    def test_limit_offset(self, client, ranked):
+        data = client.get("/agents", params={"limit": 2, "offset": 2}).json()
+        assert data["count"] == 5
+        assert [a["wallet"] for a in data["agents"]] == ranked[2:4]
+
+    def test_offset_past_end(self, client, ranked):
+        data = client.get("/agents", params={"limit": 3, "offset": 10}).json()
+        assert data == {"count": 5, "agents": []}
+
+    def test_offset_only(self, client, ranked):
+        data = client.get("/agents", params={"offset": 3}).json()
+        assert [a["wallet"] for a in data["agents"]] == ranked[3:]
+
+
+class TestAdvanceTicks:
+    """/debug/advance_ticks clamps n to 0..100"""
+
+    @pytest.mark.parametrize("n, expected", [(3, 3), (0, 0), (-5, 0), (500, 100)])
+    def test_clamping(self, client, world, n, expected):
+        data = client.post("/debug/advance_ticks", params={"n": n}).json()
+        assert data["count"] == expected
+        assert world.state.tick == expected
+
+
+class TestPubkeyValidation:
+    """is_valid_solana_pubkey accepts only base58 that decodes to 32 bytes"""
+
+    def test_valid(self):
+        assert is_valid_solana_pubkey(WALLET)
+        assert is_valid_solana_pubkey("11111111111111111111111111111111")
+
+    @pytest.mark.parametrize("address", [
+        "1" * 44,             # 44 chars, decodes to 44 zero bytes
+        "z" * 44,             # 44 chars, decodes to more than 32 bytes
+        "0" * 44,             # not in the base58 alphabet
+        "So1111111111111111111111111111111111111111l",  # 'l' is not base58
+        "short",
+        "é" * 40,
+    ])
+    def test_invalid(self, address):
+        assert not is_valid_solana_pubkey(address)
+
+    def test_rejected_input_not_cached(self):
+        action._decode_pubkey_32.cache_clear()
+        for address in ["1" * 10_000, "0" * 40, "short", "é" * 40]:
+            assert not is_valid_solana_pubkey(address)
+        assert action._decode_pubkey_32.cache_info().currsize == 0
+
+        assert is_valid_solana_pubkey(WALLET)
+        assert action._decode_pubkey_32.cache_info().currsize == 1
+
+
+class TestFmtSol:
+    """fmt_sol rounds lamports to 6 decimals with integer math"""
+
+    @pytest.mark.parametrize("lamports, expected", [
+        (0, "0.000000 SOL"),
+        (1, "0.000000 SOL"),
+        (499, "0.000000 SOL"),
+        (500, "0.000001 SOL"),
+        (10_000_000, "0.010000 SOL"),
+        (1_999_999_499, "1.999999 SOL"),
+        (1_999_999_500, "2.000000 SOL"),
+        (123_456_789_012, "123.456789 SOL"),
+    ])
+    def test_rounding(self, lamports, expected):
+        assert fmt_sol(lamports) == expected
+
+
+class TestRequestBodies:
+    """Bodies are validated from raw JSON with FastAPI's 422 error shape"""
+
+    def test_missing_field(self, client):
+        resp = client.post("/register", json={"wallet": WALLET})
+        assert resp.status_code == 422
+        [error] = resp.json()["detail"]
+        assert error["type"] == "missing"
+        assert error["loc"] == ["body", "name"]
+
+    def test_wrong_type(self, client):
+        resp = client.post("/action", json={"actor": WALLET, "action": "rest", "params": "x"})
+        assert resp.status_code == 422
+        assert resp.json()["detail"][0]["loc"] == ["body", "params"]
+
+    def test_invalid_json(self, client):
+        resp = client.post(
+            "/register", content=b"{not json", headers={"Content-Type": "application/json"}
+        )
+        assert resp.status_code == 422
+        assert resp.json()["detail"][0]["type"] == "json_invalid"